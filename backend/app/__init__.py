@@ -4,6 +4,7 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_bcrypt import Bcrypt
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -21,12 +22,39 @@ def create_app(config_name='default'):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Client address and scheme from trusted proxies' X-Forwarded-* headers
+    proxy_count = app.config['TRUSTED_PROXY_COUNT']
+    if proxy_count > 0:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
+    
+    # JSON encoder for responses (orjson when available)
+    from .utils.json_provider import make_json_provider
+    app.json = make_json_provider(app)
+    
+    # Connection pool settings from the DB_POOL_* config (unless engine options are set directly)
+    from .utils.database import engine_options, apply_sqlite_pragmas
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config))
+    
     # Initialize extensions with app
     db.init_app(app)
     jwt.init_app(app)
     bcrypt.init_app(app)
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
+    # Thread pool for bcrypt hashing and verification
+    from .services.password_hasher import password_hasher
+    password_hasher.init_app(app)
+    
+    # Login rate limiting and failed login cache
+    from .services.login_limiter import login_limiter
+    login_limiter.init_app(app)
+    
+    # SQLite pragmas and per-request query count, DB time and pool wait
+    from .services.db_metrics import db_metrics
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config)
+        db_metrics.init_app(app, db.engine)
+    
     # Register blueprints
     from .routes import auth, profile, health, prediction, dashboard
     app.register_blueprint(auth.bp)
@@ -35,13 +63,38 @@ def create_app(config_name='default'):
     app.register_blueprint(prediction.bp)
     app.register_blueprint(dashboard.bp)
     
-    # Create database tables
+    # Create database tables, then store and cache the precomputed recommendation sets
+    from .models.recommendation_set import RecommendationSetRecord
+    from .services.recommendation_engine import RECOMMENDATION_TABLE
     with app.app_context():
         db.create_all()
+        RecommendationSetRecord.sync(RECOMMENDATION_TABLE.values())
+    
+    # Load and warm up ML models before serving (shared copy-on-write under gunicorn preload_app)
+    from .services.ml_service import ml_service
+    from .services.prediction_cache import prediction_cache
+    from .services.user_cache import user_cache
+    prediction_cache.init_app(app)
+    user_cache.init_app(app)
+    ml_service.add_reload_listener(prediction_cache.clear)
+    ml_service.init_app(app)
+    
+    # Request latency histograms and GET /metrics
+    from .services.metrics import metrics
+    metrics.init_app(app)
     
     # Health check endpoint
     @app.route('/api/health', methods=['GET'])
     def health_check():
-        return {'status': 'healthy', 'message': 'Health Insight Hub API is running'}, 200
+        return {
+            'status': 'healthy',
+            'message': 'Health Insight Hub API is running',
+            'ml_models': ml_service.status(),
+            'prediction_cache': prediction_cache.stats(),
+            'user_cache': user_cache.stats(),
+            'password_hasher': password_hasher.stats(),
+            'login_limiter': login_limiter.stats(),
+            'database': db_metrics.stats()
+        }, 200
     
     return app
@@ -7,13 +7,109 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///health_insight.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Database connection pool, used to build SQLALCHEMY_ENGINE_OPTIONS (not used for in-memory SQLite;
+    # pre-ping and recycle only apply to server databases)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))  # seconds to wait for a connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # seconds, -1 to never recycle
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
+    # SQLite pragmas set on every new connection (SQLite databases only, empty to leave the default)
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))  # milliseconds
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -20000))  # pages, or KiB if negative
+    
+    # Per-request database instrumentation: Server-Timing and X-DB-Queries response headers,
+    # and a logged warning for requests over either threshold
+    DB_INSTRUMENTATION = os.environ.get('DB_INSTRUMENTATION', 'True').lower() == 'true'
+    DB_QUERY_WARN_COUNT = int(os.environ.get('DB_QUERY_WARN_COUNT', 25))
+    DB_POOL_WAIT_WARN_MS = float(os.environ.get('DB_POOL_WAIT_WARN_MS', 100))
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key-change-in-production'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=int(os.environ.get('JWT_ACCESS_TOKEN_EXPIRES', 1)))
     
+    # Password hashing: bcrypt cost (existing hashes are upgraded on login when it changes)
+    # and a dedicated thread pool that bounds concurrent hashes per process (0 workers = inline)
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get('PASSWORD_HASH_MAX_QUEUE', 32))
+    
+    # Reverse proxies in front of the app (e.g. 1 on Render); their X-Forwarded-For and
+    # X-Forwarded-Proto headers are trusted for the client address and scheme (0: none)
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+    
+    # Login rate limiting: token buckets per client IP and per email
+    # (memory: per process, sqlite: shared local file, none: disabled)
+    LOGIN_RATE_LIMIT_BACKEND = os.environ.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    LOGIN_RATE_LIMIT_PATH = os.environ.get('LOGIN_RATE_LIMIT_PATH')  # default: instance/login_rate_limit.db
+    LOGIN_RATE_LIMIT_MAX_KEYS = int(os.environ.get('LOGIN_RATE_LIMIT_MAX_KEYS', 100000))
+    LOGIN_RATE_LIMIT_IP_BURST = int(os.environ.get('LOGIN_RATE_LIMIT_IP_BURST', 20))
+    LOGIN_RATE_LIMIT_IP_PER_MINUTE = float(os.environ.get('LOGIN_RATE_LIMIT_IP_PER_MINUTE', 20))
+    LOGIN_RATE_LIMIT_EMAIL_BURST = int(os.environ.get('LOGIN_RATE_LIMIT_EMAIL_BURST', 5))
+    LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE = float(os.environ.get('LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE', 5))
+    
+    # Failed logins are refused without a lookup for this many seconds (0 disables)
+    LOGIN_FAILURE_CACHE_TTL = int(os.environ.get('LOGIN_FAILURE_CACHE_TTL', 30))
+    
     # ML Models Path
     ML_MODELS_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'app', 'ml_models')
     
+    # Load and warm up ML models in create_app instead of on the first prediction
+    ML_PRELOAD_MODELS = os.environ.get('ML_PRELOAD_MODELS', 'True').lower() == 'true'
+    
+    # ML inference mode: best (selected model only), all, or audit (others run in background)
+    ML_INFERENCE_MODE = os.environ.get('ML_INFERENCE_MODE', 'best')
+    
+    # ML inference backend: native (NumPy arrays) or sklearn
+    ML_INFERENCE_BACKEND = os.environ.get('ML_INFERENCE_BACKEND', 'native')
+    
+    # ML model artifact format: pickle or npy (memory-mapped, requires native backend)
+    ML_MODEL_FORMAT = os.environ.get('ML_MODEL_FORMAT', 'pickle')
+    
+    # Micro-batching: concurrent predictions arriving within MAX_WAIT_MS share one inference pass
+    # (useful with threaded workers, e.g. GUNICORN_THREADS > 1)
+    ML_MICRO_BATCH_ENABLED = os.environ.get('ML_MICRO_BATCH_ENABLED', 'False').lower() == 'true'
+    ML_MICRO_BATCH_MAX_SIZE = int(os.environ.get('ML_MICRO_BATCH_MAX_SIZE', 64))
+    ML_MICRO_BATCH_MAX_WAIT_MS = float(os.environ.get('ML_MICRO_BATCH_MAX_WAIT_MS', 5))
+    
+    # Prediction result cache: memory (per process), sqlite (shared local file) or none
+    PREDICTION_CACHE_BACKEND = os.environ.get('PREDICTION_CACHE_BACKEND', 'memory')
+    PREDICTION_CACHE_MAX_SIZE = int(os.environ.get('PREDICTION_CACHE_MAX_SIZE', 10000))
+    PREDICTION_CACHE_TTL = int(os.environ.get('PREDICTION_CACHE_TTL', 3600))  # seconds
+    PREDICTION_CACHE_QUANTUM = float(os.environ.get('PREDICTION_CACHE_QUANTUM', 0.01))
+    PREDICTION_CACHE_PATH = os.environ.get('PREDICTION_CACHE_PATH')  # default: instance/prediction_cache.db
+    
+    # Per-process cache of users for authenticated routes; updates in other processes show after the TTL
+    USER_CACHE_ENABLED = os.environ.get('USER_CACHE_ENABLED', 'True').lower() == 'true'
+    USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 10000))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))  # seconds
+    
+    # Embed the user's age in access tokens; prediction and health routes read it from there
+    USER_JWT_CLAIMS = os.environ.get('USER_JWT_CLAIMS', 'False').lower() == 'true'
+    
+    # Batch predictions
+    PREDICTION_BATCH_MAX_SIZE = int(os.environ.get('PREDICTION_BATCH_MAX_SIZE', 500))
+    
+    # Asynchronous predictions: jobs queued in the database, drained by scripts/prediction_worker.py
+    PREDICTION_ASYNC_DEFAULT = os.environ.get('PREDICTION_ASYNC_DEFAULT', 'False').lower() == 'true'
+    PREDICTION_WORKER_PROCESSES = int(os.environ.get('PREDICTION_WORKER_PROCESSES', 2))
+    PREDICTION_WORKER_BATCH_SIZE = int(os.environ.get('PREDICTION_WORKER_BATCH_SIZE', 50))
+    PREDICTION_WORKER_POLL_INTERVAL = float(os.environ.get('PREDICTION_WORKER_POLL_INTERVAL', 0.5))  # seconds
+    PREDICTION_JOB_TIMEOUT = int(os.environ.get('PREDICTION_JOB_TIMEOUT', 300))  # seconds before a running job is requeued
+    
+    # Bulk health record import: rows per request and rows per insert transaction
+    HEALTH_IMPORT_MAX_ROWS = int(os.environ.get('HEALTH_IMPORT_MAX_ROWS', 10000))
+    HEALTH_IMPORT_CHUNK_SIZE = int(os.environ.get('HEALTH_IMPORT_CHUNK_SIZE', 500))
+    
+    # API response JSON encoder: auto (orjson if installed), orjson or stdlib
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    
+    # Prometheus-style metrics at GET /metrics (per worker process)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:8080').split(',')
 
@@ -26,12 +122,16 @@ class ProductionConfig(Config):
     """Production configuration"""
     DEBUG = False
     TESTING = False
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
 
 class TestingConfig(Config):
     """Testing configuration"""
     DEBUG = True
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test_health_insight.db'
+    BCRYPT_LOG_ROUNDS = 4
+    SQLITE_SYNCHRONOUS = 'OFF'
 
 config = {
     'development': DevelopmentConfig,
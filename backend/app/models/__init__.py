@@ -1,5 +1,8 @@
 from .user import User
 from .health_record import HealthRecord
+from .recommendation_set import RecommendationSetRecord
 from .prediction import Prediction
+from .user_health_summary import UserHealthSummary
+from .prediction_job import PredictionJob
 
-__all__ = ['User', 'HealthRecord', 'Prediction']
+__all__ = ['User', 'HealthRecord', 'Prediction', 'RecommendationSetRecord', 'UserHealthSummary', 'PredictionJob']
@@ -1,9 +1,14 @@
 from datetime import datetime
+import numpy as np
 from app import db
 
 class HealthRecord(db.Model):
     """Health record model for storing user health data"""
     __tablename__ = 'health_records'
+    __table_args__ = (
+        # Per-user, newest-first listing (also serves plain user_id lookups)
+        db.Index('ix_health_records_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -23,6 +28,10 @@ class HealthRecord(db.Model):
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Numbered per row on insert, so batched INSERT .. RETURNING can return ids in row order
+    # on SQLite too (without it SQLAlchemy sends one INSERT per row); never read
+    _sentinel = db.insert_sentinel('_sentinel')
+    
     # Relationships
     predictions = db.relationship('Prediction', backref='health_record', lazy=True, cascade='all, delete-orphan')
     
@@ -32,22 +41,40 @@ class HealthRecord(db.Model):
         height_m = height / 100  # convert cm to meters
         return round(weight / (height_m ** 2), 2)
     
-    def to_dict(self):
-        """Convert health record to dictionary"""
+    @staticmethod
+    def calculate_bmi_batch(weight, height):
+        """Calculate BMI for arrays of weights (kg) and heights (cm)"""
+        height_m = np.asarray(height, dtype=np.float64) / 100
+        bmi = np.asarray(weight, dtype=np.float64) / (height_m ** 2)
+        # Python round (exact decimal rounding), not np.round, to match calculate_bmi
+        return np.array([round(value, 2) for value in bmi.ravel().tolist()], dtype=np.float64).reshape(bmi.shape)
+    
+    @classmethod
+    def row_query(cls):
+        """Query for plain column rows instead of ORM objects, for read-only lists (format with serialize)"""
+        return db.session.query(*cls.__mapper__.columns)  # mapped columns: no insert sentinel
+    
+    @staticmethod
+    def serialize(record):
+        """Convert a health record or a row_query row to dictionary"""
         return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'height': self.height,
-            'weight': self.weight,
-            'bmi': self.bmi,
+            'id': record.id,
+            'user_id': record.user_id,
+            'height': record.height,
+            'weight': record.weight,
+            'bmi': record.bmi,
             'blood_pressure': {
-                'systolic': self.blood_pressure_systolic,
-                'diastolic': self.blood_pressure_diastolic
+                'systolic': record.blood_pressure_systolic,
+                'diastolic': record.blood_pressure_diastolic
             },
-            'blood_sugar': self.blood_sugar,
-            'lifestyle_habits': self.lifestyle_habits,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'blood_sugar': record.blood_sugar,
+            'lifestyle_habits': record.lifestyle_habits,
+            'created_at': record.created_at.isoformat() if record.created_at else None
         }
     
+    def to_dict(self):
+        """Convert health record to dictionary"""
+        return HealthRecord.serialize(self)
+    
     def __repr__(self):
         return f'<HealthRecord {self.id} for User {self.user_id}>'
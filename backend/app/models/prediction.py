@@ -1,14 +1,29 @@
 from datetime import datetime
+from functools import lru_cache
 from app import db
+from app.models.recommendation_set import RecommendationSetRecord
+from app.utils.json_provider import EncodedDict
 import json
 
+# models_used keys, in models_code order
+MODEL_KEYS = ('diabetes', 'heart_disease', 'obesity')
+
+@lru_cache(maxsize=None)
+def _decode_models_code(models_code):
+    """'rf,rf,lr' -> {'diabetes': 'rf', 'heart_disease': 'rf', 'obesity': 'lr'} (shared, must not be mutated)"""
+    return EncodedDict(zip(MODEL_KEYS, models_code.split(',')))
+
 class Prediction(db.Model):
     """Prediction model for storing ML prediction results"""
     __tablename__ = 'predictions'
+    __table_args__ = (
+        # Per-user, newest-first listing (also serves plain user_id lookups)
+        db.Index('ix_predictions_user_id_created_at', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    health_record_id = db.Column(db.Integer, db.ForeignKey('health_records.id'), nullable=False)
+    health_record_id = db.Column(db.Integer, db.ForeignKey('health_records.id'), nullable=False, index=True)
     
     # Disease risk predictions (0-1 probability)
     diabetes_risk = db.Column(db.Float, nullable=False)
@@ -19,51 +34,88 @@ class Prediction(db.Model):
     overall_risk_score = db.Column(db.Float, nullable=False)  # 0-100
     risk_category = db.Column(db.String(20), nullable=False)  # Low, Medium, High
     
-    # Recommendations (stored as JSON)
-    recommendations = db.Column(db.Text, nullable=True)
+    # Recommendations (deduplicated set) and model information ('rf,rf,rf' in MODEL_KEYS order)
+    recommendation_set_id = db.Column(db.Integer, db.ForeignKey('recommendation_sets.id'), nullable=True)
+    models_code = db.Column(db.String(32), nullable=True)
     
-    # Model information
-    models_used = db.Column(db.Text, nullable=True)  # JSON string with model names
+    # Legacy per-row JSON, still read for predictions saved before recommendation sets
+    recommendations = db.Column(db.Text, nullable=True)
+    models_used = db.Column(db.Text, nullable=True)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Numbered per row on insert, so batched INSERT .. RETURNING can return ids in row order
+    # on SQLite too (without it SQLAlchemy sends one INSERT per row); never read
+    _sentinel = db.insert_sentinel('_sentinel')
+    
     def set_recommendations(self, recommendations_dict):
-        """Store recommendations as JSON string"""
-        self.recommendations = json.dumps(recommendations_dict)
+        """Store recommendations as a reference to the matching recommendation set"""
+        self.recommendation_set_id = RecommendationSetRecord.id_for(recommendations_dict)
+        self.recommendations = None
     
     def get_recommendations(self):
-        """Parse recommendations from JSON string"""
-        if self.recommendations:
-            return json.loads(self.recommendations)
+        """Recommendations from the recommendation set (or legacy JSON string)"""
+        return Prediction._decode_recommendations(self.recommendation_set_id, self.recommendations)
+    
+    @staticmethod
+    def _decode_recommendations(recommendation_set_id, recommendations):
+        if recommendation_set_id is not None:
+            return RecommendationSetRecord.get_content(recommendation_set_id)
+        if recommendations:
+            return json.loads(recommendations)
         return None
     
     def set_models_used(self, models_dict):
-        """Store model information as JSON string"""
-        self.models_used = json.dumps(models_dict)
+        """Store model information as a compact code (JSON string if it doesn't fit the code)"""
+        names = [models_dict.get(key) for key in MODEL_KEYS]
+        if list(models_dict) == list(MODEL_KEYS) and all(isinstance(name, str) and ',' not in name for name in names):
+            self.models_code = ','.join(names)
+            self.models_used = None
+        else:
+            self.models_code = None
+            self.models_used = json.dumps(models_dict)
     
     def get_models_used(self):
-        """Parse model information from JSON string"""
-        if self.models_used:
-            return json.loads(self.models_used)
+        """Model information from the compact code (or legacy JSON string)"""
+        return Prediction._decode_models_used(self.models_code, self.models_used)
+    
+    @staticmethod
+    def _decode_models_used(models_code, models_used):
+        if models_code:
+            return _decode_models_code(models_code)
+        if models_used:
+            return json.loads(models_used)
         return None
     
-    def to_dict(self):
-        """Convert prediction to dictionary"""
+    @classmethod
+    def row_query(cls):
+        """Query for plain column rows instead of ORM objects, for read-only lists (format with serialize)"""
+        return db.session.query(*cls.__mapper__.columns)  # mapped columns: no insert sentinel
+    
+    @staticmethod
+    def serialize(prediction):
+        """Convert a prediction or a row_query row to dictionary"""
         return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'health_record_id': self.health_record_id,
+            'id': prediction.id,
+            'user_id': prediction.user_id,
+            'health_record_id': prediction.health_record_id,
             'risks': {
-                'diabetes': round(self.diabetes_risk * 100, 2),
-                'heart_disease': round(self.heart_disease_risk * 100, 2),
-                'obesity': round(self.obesity_risk * 100, 2)
+                'diabetes': round(prediction.diabetes_risk * 100, 2),
+                'heart_disease': round(prediction.heart_disease_risk * 100, 2),
+                'obesity': round(prediction.obesity_risk * 100, 2)
             },
-            'overall_risk_score': self.overall_risk_score,
-            'risk_category': self.risk_category,
-            'recommendations': self.get_recommendations(),
-            'models_used': self.get_models_used(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'overall_risk_score': prediction.overall_risk_score,
+            'risk_category': prediction.risk_category,
+            'recommendations': Prediction._decode_recommendations(
+                prediction.recommendation_set_id, prediction.recommendations
+            ),
+            'models_used': Prediction._decode_models_used(prediction.models_code, prediction.models_used),
+            'created_at': prediction.created_at.isoformat() if prediction.created_at else None
         }
     
+    def to_dict(self):
+        """Convert prediction to dictionary"""
+        return Prediction.serialize(self)
+    
     def __repr__(self):
         return f'<Prediction {self.id} - {self.risk_category} Risk>'
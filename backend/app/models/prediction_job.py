@@ -0,0 +1,51 @@
+from datetime import datetime
+from app import db
+
+class PredictionJob(db.Model):
+    """Queued prediction request, drained by scripts/prediction_worker.py"""
+    __tablename__ = 'prediction_jobs'
+    __table_args__ = (
+        # Workers claim the oldest pending jobs first
+        db.Index('ix_prediction_jobs_status_id', 'status', 'id'),
+    )
+
+    # Job states
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    health_record_id = db.Column(db.Integer, db.ForeignKey('health_records.id'), nullable=False)
+
+    status = db.Column(db.String(20), nullable=False, default=PENDING)
+    claim_token = db.Column(db.String(32), nullable=True, index=True)  # set by the worker that claimed the job
+
+    # Result
+    prediction_id = db.Column(db.Integer, db.ForeignKey('predictions.id'), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # Relationships
+    prediction = db.relationship('Prediction', lazy=True)
+
+    def to_dict(self):
+        """Convert job to dictionary, including the prediction once completed"""
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'health_record_id': self.health_record_id,
+            'status': self.status,
+            'prediction': self.prediction.to_dict() if self.prediction else None,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<PredictionJob {self.id} - {self.status}>'
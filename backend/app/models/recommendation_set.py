@@ -0,0 +1,94 @@
+import hashlib
+import json
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.utils.json_provider import EncodedDict
+
+class RecommendationSetRecord(db.Model):
+    """
+    Distinct recommendation set, stored once and referenced by predictions
+    instead of every prediction row holding its own JSON copy
+    """
+    __tablename__ = 'recommendation_sets'
+
+    id = db.Column(db.Integer, primary_key=True)
+    digest = db.Column(db.String(64), unique=True, nullable=False)  # sha256 of content
+    content = db.Column(db.Text, nullable=False)  # JSON string
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Per-process caches; stored sets never change
+    _ids = {}  # content JSON -> id
+    _contents = {}  # id -> recommendations (EncodedDict)
+
+    @staticmethod
+    def encode(recommendations):
+        """Stored JSON for a recommendations dict (precomputed for lookup table sets)"""
+        return getattr(recommendations, 'content', None) or json.dumps(recommendations)
+
+    @classmethod
+    def sync(cls, recommendation_sets):
+        """
+        Store any of recommendation_sets that are missing, then cache every stored set
+        Called at startup with the recommendation engine's lookup table, so predictions
+        normally resolve their set without touching the database
+        """
+        stored = {digest for digest, in db.session.query(cls.digest)}
+
+        added = False
+        for content in {cls.encode(recommendations) for recommendations in recommendation_sets}:
+            digest = hashlib.sha256(content.encode()).hexdigest()
+            if digest not in stored:
+                db.session.add(cls(digest=digest, content=content))
+                added = True
+
+        if added:
+            try:
+                db.session.commit()
+            except IntegrityError:
+                # Another worker stored the same sets first
+                db.session.rollback()
+
+        rows = db.session.query(cls.id, cls.content).all()
+        cls._ids = {content: set_id for set_id, content in rows}
+        cls._contents = {set_id: EncodedDict.from_json(content) for set_id, content in rows}
+
+    @classmethod
+    def id_for(cls, recommendations):
+        """Id of the stored set for recommendations, adding it to the session if new (caller commits)"""
+        content = cls.encode(recommendations)
+
+        set_id = cls._ids.get(content)
+        if set_id is not None:
+            return set_id
+
+        digest = hashlib.sha256(content.encode()).hexdigest()
+        record = cls.query.filter_by(digest=digest).first()
+        if record is None:
+            record = cls(digest=digest, content=content)
+            db.session.add(record)
+            db.session.flush()
+            # Not cached by this session: the transaction may still roll back
+            db.session.info.setdefault('uncommitted_recommendation_sets', set()).add(record.id)
+
+        return record.id
+
+    @classmethod
+    def get_content(cls, set_id):
+        """Recommendations dict for a stored set (shared, must not be mutated)"""
+        recommendations = cls._contents.get(set_id)
+        if recommendations is not None:
+            return recommendations
+
+        record = db.session.get(cls, set_id)
+        if record is None:
+            return None
+
+        recommendations = EncodedDict.from_json(record.content)
+        if set_id not in db.session.info.get('uncommitted_recommendation_sets', ()):
+            cls._contents[set_id] = recommendations
+            cls._ids[record.content] = set_id
+        return recommendations
+
+    def __repr__(self):
+        return f'<RecommendationSetRecord {self.id}>'
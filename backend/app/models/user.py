@@ -1,5 +1,6 @@
 from datetime import datetime
-from app import db, bcrypt
+from app import db
+from app.services.password_hasher import password_hasher
 
 class User(db.Model):
     """User model for authentication and profile management"""
@@ -17,25 +18,40 @@ class User(db.Model):
     # Relationships
     health_records = db.relationship('HealthRecord', backref='user', lazy=True, cascade='all, delete-orphan')
     predictions = db.relationship('Prediction', backref='user', lazy=True, cascade='all, delete-orphan')
+    health_summary = db.relationship('UserHealthSummary', backref='user', uselist=False, lazy=True, cascade='all, delete-orphan')
     
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hash and set password (on the password hashing pool)"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check if provided password matches hash"""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Check if provided password matches hash (on the password hashing pool)"""
+        return password_hasher.verify(self.password_hash, password)
     
-    def to_dict(self):
-        """Convert user to dictionary (exclude password)"""
+    def password_needs_rehash(self):
+        """Whether the password hash uses a different cost than BCRYPT_LOG_ROUNDS"""
+        return password_hasher.needs_rehash(self.password_hash)
+    
+    @classmethod
+    def row_query(cls):
+        """Query for plain column rows without the password hash, for read-only use (format with serialize)"""
+        return db.session.query(cls.id, cls.email, cls.name, cls.age, cls.gender, cls.created_at)
+    
+    @staticmethod
+    def serialize(user):
+        """Convert a user or a row_query row to dictionary (exclude password)"""
         return {
-            'id': self.id,
-            'email': self.email,
-            'name': self.name,
-            'age': self.age,
-            'gender': self.gender,
-            'created_at': self.created_at.isoformat() if self.created_at else None
+            'id': user.id,
+            'email': user.email,
+            'name': user.name,
+            'age': user.age,
+            'gender': user.gender,
+            'created_at': user.created_at.isoformat() if user.created_at else None
         }
     
+    def to_dict(self):
+        """Convert user to dictionary (exclude password)"""
+        return User.serialize(self)
+    
     def __repr__(self):
         return f'<User {self.email}>'
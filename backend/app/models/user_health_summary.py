@@ -0,0 +1,182 @@
+from datetime import datetime
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.health_record import HealthRecord
+from app.models.prediction import Prediction
+
+class UserHealthSummary(db.Model):
+    """
+    Per-user dashboard totals, updated in the same transaction as every
+    health record and prediction insert so the dashboard is a primary-key lookup
+    """
+    __tablename__ = 'user_health_summary'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+
+    # Health records
+    record_count = db.Column(db.Integer, nullable=False, default=0)
+    bmi_sum = db.Column(db.Float, nullable=False, default=0.0)
+
+    # Predictions
+    prediction_count = db.Column(db.Integer, nullable=False, default=0)
+    latest_prediction_id = db.Column(db.Integer, db.ForeignKey('predictions.id'), nullable=True)
+    latest_risk_score = db.Column(db.Float, nullable=True)
+    previous_risk_score = db.Column(db.Float, nullable=True)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @classmethod
+    def _get_for_update(cls, user_id):
+        """
+        Get the user's summary row (locked on databases that support it)
+        A missing row (e.g. a user from before summaries existed) is seeded from the user's
+        records and predictions, including this transaction's, so it needs no increments
+        Returns (summary, seeded)
+        """
+        summary = db.session.get(cls, user_id, with_for_update=True)
+        if summary is not None:
+            return summary, False
+
+        db.session.flush()
+        summary = cls._aggregate([user_id]).get(user_id) or \
+            cls(user_id=user_id, record_count=0, bmi_sum=0.0, prediction_count=0)
+        try:
+            with db.session.begin_nested():
+                db.session.add(summary)
+        except IntegrityError:
+            # Another transaction created it first; its totals don't include this transaction's rows
+            summary = db.session.get(cls, user_id, with_for_update=True, populate_existing=True)
+            return summary, False
+        return summary, True
+
+    def _increment(self, column, amount):
+        """Add to a counter in SQL (column = column + amount) so concurrent writers don't lose updates"""
+        if self in db.session.new:
+            setattr(self, column, getattr(self, column) + amount)
+        else:
+            setattr(self, column, getattr(type(self), column) + amount)
+
+    @classmethod
+    def add_health_records(cls, user_id, count, bmi_sum):
+        """Account for newly added health records (call before commit)"""
+        summary, seeded = cls._get_for_update(user_id)
+        if not seeded:
+            summary._increment('record_count', count)
+            summary._increment('bmi_sum', bmi_sum)
+        return summary
+
+    @classmethod
+    def add_predictions(cls, user_id, predictions):
+        """
+        Account for newly added predictions, oldest first (call after flush, before commit)
+        The last one becomes the latest prediction
+        """
+        summary, seeded = cls._get_for_update(user_id)
+        if seeded:
+            return summary
+
+        for prediction in predictions:
+            summary.previous_risk_score = summary.latest_risk_score
+            summary.latest_risk_score = prediction.overall_risk_score
+            summary.latest_prediction_id = prediction.id
+        summary._increment('prediction_count', len(predictions))
+        return summary
+
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """
+        Recompute summaries from health_records and predictions
+        Rebuilds every user when user_ids is None; caller commits
+        Returns the number of summaries written
+        """
+        summaries = cls._aggregate(user_ids)
+
+        existing = cls.query
+        if user_ids is not None:
+            existing = existing.filter(cls.user_id.in_(user_ids))
+
+        existing.delete(synchronize_session='fetch')
+        db.session.add_all(summaries.values())
+
+        return len(summaries)
+
+    @classmethod
+    def _aggregate(cls, user_ids=None):
+        """
+        Compute summaries from health_records and predictions (every user when user_ids is None)
+        Returns {user_id: unsaved UserHealthSummary} for users with any records or predictions
+        """
+        record_stats = db.session.query(
+            HealthRecord.user_id,
+            func.count(HealthRecord.id),
+            func.sum(HealthRecord.bmi)
+        ).group_by(HealthRecord.user_id)
+
+        prediction_counts = db.session.query(
+            Prediction.user_id,
+            func.count(Prediction.id)
+        ).group_by(Prediction.user_id)
+
+        ranked = db.session.query(
+            Prediction.user_id,
+            Prediction.id,
+            Prediction.overall_risk_score,
+            func.row_number().over(
+                partition_by=Prediction.user_id,
+                order_by=(Prediction.created_at.desc(), Prediction.id.desc())
+            ).label('position')
+        )
+
+        if user_ids is not None:
+            record_stats = record_stats.filter(HealthRecord.user_id.in_(user_ids))
+            prediction_counts = prediction_counts.filter(Prediction.user_id.in_(user_ids))
+            ranked = ranked.filter(Prediction.user_id.in_(user_ids))
+
+        ranked = ranked.subquery()
+        latest = db.session.query(ranked).filter(ranked.c.position <= 2)
+
+        summaries = {}
+
+        def summary_for(user_id):
+            if user_id not in summaries:
+                summaries[user_id] = cls(user_id=user_id, record_count=0, bmi_sum=0.0, prediction_count=0)
+            return summaries[user_id]
+
+        for user_id, count, bmi_sum in record_stats:
+            summary = summary_for(user_id)
+            summary.record_count = count
+            summary.bmi_sum = bmi_sum or 0.0
+
+        for user_id, count in prediction_counts:
+            summary_for(user_id).prediction_count = count
+
+        for row in latest:
+            summary = summary_for(row.user_id)
+            if row.position == 1:
+                summary.latest_prediction_id = row.id
+                summary.latest_risk_score = row.overall_risk_score
+            else:
+                summary.previous_risk_score = row.overall_risk_score
+
+        return summaries
+
+    @property
+    def average_bmi(self):
+        if not self.record_count:
+            return None
+        return round(self.bmi_sum / self.record_count, 2)
+
+    @property
+    def risk_trend(self):
+        """Compare the latest two predictions"""
+        if self.latest_risk_score is None or self.previous_risk_score is None:
+            return None
+        if self.latest_risk_score < self.previous_risk_score:
+            return 'improving'
+        elif self.latest_risk_score > self.previous_risk_score:
+            return 'worsening'
+        return 'stable'
+
+    def __repr__(self):
+        return f'<UserHealthSummary for User {self.user_id}>'
@@ -1,7 +1,11 @@
-from flask import Blueprint, request, jsonify
+import math
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token
 from app import db
 from app.models.user import User
+from app.services.user_cache import user_cache
+from app.services.password_hasher import password_hasher, PasswordHasherBusy
+from app.services.login_limiter import login_limiter
 from app.utils.validators import validate_email, validate_password, validate_age, validate_gender
 
 bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -59,7 +63,7 @@ def register():
         db.session.commit()
         
         # Generate JWT token
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=user_cache.token_claims(user))
         
         return jsonify({
             'message': 'User registered successfully',
@@ -67,6 +71,8 @@ def register():
             'access_token': access_token
         }), 201
         
+    except PasswordHasherBusy as e:
+        return jsonify({'error': 'Registration temporarily unavailable', 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed', 'message': str(e)}), 500
@@ -87,15 +93,38 @@ def login():
         email = data['email'].strip().lower()
         password = data['password']
         
+        # Shed repeated attempts before the user lookup and bcrypt
+        wait = login_limiter.check(email, request.remote_addr)
+        if wait:
+            retry_after = str(math.ceil(wait))
+            return jsonify({
+                'error': 'Too many login attempts',
+                'message': f'Try again in {retry_after} seconds'
+            }), 429, {'Retry-After': retry_after}
+        
+        if login_limiter.recently_failed(email, password):
+            return jsonify({'error': 'Invalid email or password'}), 401
+        
         # Find user by email
         user = User.query.filter_by(email=email).first()
         
         # Verify user exists and password is correct
         if not user or not user.check_password(password):
+            login_limiter.record_failure(email, password)
             return jsonify({'error': 'Invalid email or password'}), 401
         
+        # Rehash with the current BCRYPT_LOG_ROUNDS; the login succeeds even if this fails
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                password_hasher.record_rehash_failure()
+                current_app.logger.exception('Password rehash failed for user %s; keeping the old hash', user.id)
+        
         # Generate JWT token
-        access_token = create_access_token(identity=user.id)
+        access_token = create_access_token(identity=user.id, additional_claims=user_cache.token_claims(user))
         
         return jsonify({
             'message': 'Login successful',
@@ -103,6 +132,8 @@ def login():
             'access_token': access_token
         }), 200
         
+    except PasswordHasherBusy as e:
+        return jsonify({'error': 'Login temporarily unavailable', 'message': str(e)}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': 'Login failed', 'message': str(e)}), 500
 
@@ -1,8 +1,10 @@
-from flask import Blueprint, jsonify
+from datetime import datetime, timezone
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.prediction import Prediction
 from app.models.health_record import HealthRecord
+from app.models.user_health_summary import UserHealthSummary
 from sqlalchemy import func
 
 bp = Blueprint('dashboard', __name__, url_prefix='/api/dashboard')
@@ -14,26 +16,48 @@ def get_dashboard_stats():
     try:
         user_id = get_jwt_identity()
         
-        # Get latest prediction
-        latest_prediction = Prediction.query.filter_by(user_id=user_id).order_by(
-            Prediction.created_at.desc()
-        ).first()
+        # Served from the maintained per-user summary (primary-key lookups)
+        summary = db.session.get(UserHealthSummary, user_id)
+        if summary is not None:
+            latest_prediction = None
+            if summary.latest_prediction_id is not None:
+                latest_prediction = db.session.get(Prediction, summary.latest_prediction_id)
+            
+            return jsonify({
+                'latest_prediction': latest_prediction.to_dict() if latest_prediction else None,
+                'total_health_records': summary.record_count,
+                'total_predictions': summary.prediction_count,
+                'risk_trend': summary.risk_trend,
+                'average_bmi': summary.average_bmi,
+                'has_data': summary.record_count > 0
+            }), 200
         
-        # Get total health records
-        total_records = HealthRecord.query.filter_by(user_id=user_id).count()
+        # No summary yet (not backfilled): aggregate from the tables
+        # Get the last two predictions with the user's prediction count (window function, one query)
+        recent = db.session.query(
+            Prediction,
+            func.count().over().label('total_predictions')
+        ).filter(
+            Prediction.user_id == user_id
+        ).order_by(
+            Prediction.created_at.desc(),
+            Prediction.id.desc()
+        ).limit(2).all()
         
-        # Get total predictions
-        total_predictions = Prediction.query.filter_by(user_id=user_id).count()
+        latest_prediction = recent[0].Prediction if recent else None
+        total_predictions = recent[0].total_predictions if recent else 0
         
-        # Calculate risk trend (compare last 2 predictions)
-        predictions = Prediction.query.filter_by(user_id=user_id).order_by(
-            Prediction.created_at.desc()
-        ).limit(2).all()
+        # Get total health records and average BMI (one aggregate query)
+        total_records, avg_bmi = db.session.query(
+            func.count(HealthRecord.id),
+            func.avg(HealthRecord.bmi)
+        ).filter(HealthRecord.user_id == user_id).one()
         
+        # Calculate risk trend (compare last 2 predictions)
         risk_trend = None
-        if len(predictions) >= 2:
-            current_risk = predictions[0].overall_risk_score
-            previous_risk = predictions[1].overall_risk_score
+        if len(recent) >= 2:
+            current_risk = recent[0].Prediction.overall_risk_score
+            previous_risk = recent[1].Prediction.overall_risk_score
             
             if current_risk < previous_risk:
                 risk_trend = 'improving'
@@ -42,9 +66,6 @@ def get_dashboard_stats():
             else:
                 risk_trend = 'stable'
         
-        # Get average BMI
-        avg_bmi = db.session.query(func.avg(HealthRecord.bmi)).filter_by(user_id=user_id).scalar()
-        
         return jsonify({
             'latest_prediction': latest_prediction.to_dict() if latest_prediction else None,
             'total_health_records': total_records,
@@ -60,46 +81,77 @@ def get_dashboard_stats():
 @bp.route('/timeline', methods=['GET'])
 @jwt_required()
 def get_timeline():
-    """Get prediction timeline data for charts"""
+    """
+    Get prediction timeline data for charts
+    Optional query params: from, to (ISO 8601 datetimes), limit
+    """
     try:
         user_id = get_jwt_identity()
         
-        # Get all predictions with health records
-        predictions = Prediction.query.filter_by(user_id=user_id).order_by(
-            Prediction.created_at.desc()
-        ).all()
+        # Parse window parameters
+        try:
+            date_from = _parse_datetime(request.args.get('from'))
+            date_to = _parse_datetime(request.args.get('to'))
+        except ValueError:
+            return jsonify({'error': 'from and to must be ISO 8601 datetimes'}), 400
+        
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+        
+        # Get predictions joined with their health record's BMI in one query, chart columns only
+        query = db.session.query(
+            Prediction.id,
+            Prediction.created_at,
+            Prediction.overall_risk_score,
+            Prediction.risk_category,
+            Prediction.diabetes_risk,
+            Prediction.heart_disease_risk,
+            Prediction.obesity_risk,
+            HealthRecord.bmi
+        ).outerjoin(
+            HealthRecord, HealthRecord.id == Prediction.health_record_id
+        ).filter(Prediction.user_id == user_id)
+        
+        if date_from is not None:
+            query = query.filter(Prediction.created_at >= date_from)
+        if date_to is not None:
+            query = query.filter(Prediction.created_at <= date_to)
+        
+        # id breaks ties between predictions saved together (batch, import, queue)
+        query = query.order_by(Prediction.created_at.desc(), Prediction.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
         
         timeline_data = []
         prev_risk = None
         
-        for i, prediction in enumerate(predictions):
-            health_record = HealthRecord.query.get(prediction.health_record_id)
-            
+        for row in query:
             # Calculate trend
             trend = None
             if prev_risk is not None:
-                if prediction.overall_risk_score < prev_risk:
+                if row.overall_risk_score < prev_risk:
                     trend = 'improving'
-                elif prediction.overall_risk_score > prev_risk:
+                elif row.overall_risk_score > prev_risk:
                     trend = 'worsening'
                 else:
                     trend = 'stable'
             
             timeline_data.append({
-                'id': prediction.id,
-                'date': prediction.created_at.isoformat(),
-                'overall_risk_score': prediction.overall_risk_score,
-                'risk_category': prediction.risk_category,
+                'id': row.id,
+                'date': row.created_at.isoformat(),
+                'overall_risk_score': row.overall_risk_score,
+                'risk_category': row.risk_category,
                 'risks': {
-                    'diabetes': round(prediction.diabetes_risk * 100, 2),
-                    'heart_disease': round(prediction.heart_disease_risk * 100, 2),
-                    'obesity': round(prediction.obesity_risk * 100, 2)
+                    'diabetes': round(row.diabetes_risk * 100, 2),
+                    'heart_disease': round(row.heart_disease_risk * 100, 2),
+                    'obesity': round(row.obesity_risk * 100, 2)
                 },
                 'trend': trend,
-                'bmi': health_record.bmi if health_record else None
+                'bmi': row.bmi
             })
             
-            prev_risk = prediction.overall_risk_score
+            prev_risk = row.overall_risk_score
         
         return jsonify({
             'timeline': timeline_data,
@@ -108,3 +160,12 @@ def get_timeline():
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch timeline data', 'message': str(e)}), 500
+
+def _parse_datetime(value):
+    """Parse an optional ISO 8601 query parameter into a naive UTC datetime"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
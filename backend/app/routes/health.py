@@ -1,11 +1,19 @@
-from flask import Blueprint, request, jsonify
+import csv
+import io
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
 from app import db
-from app.models.user import User
 from app.models.health_record import HealthRecord
+from app.models.user_health_summary import UserHealthSummary
+from app.services.ml_service import ml_service
+from app.services.prediction_pipeline import prediction_pipeline
 from app.utils.validators import (
-    validate_height, validate_weight, validate_blood_pressure, validate_blood_sugar
+    validate_height, validate_weight, validate_blood_pressure, validate_blood_sugar,
+    validate_health_records_batch
 )
+from app.utils.decorators import get_current_user
+from app.utils.pagination import keyset_page, validate_limit
 
 bp = Blueprint('health', __name__, url_prefix='/api/health')
 
@@ -18,7 +26,7 @@ def create_health_record():
     """
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -73,6 +81,7 @@ def create_health_record():
         )
         
         db.session.add(health_record)
+        UserHealthSummary.add_health_records(user_id, 1, bmi)
         db.session.commit()
         
         return jsonify({
@@ -84,6 +93,151 @@ def create_health_record():
         db.session.rollback()
         return jsonify({'error': 'Failed to create health record', 'message': str(e)}), 500
 
+@bp.route('/records/bulk', methods=['POST'])
+@jwt_required()
+def import_health_records():
+    """
+    Import many health records at once
+    Body: JSON array of health records, or CSV (text/csv body or multipart 'file') with a header row
+    Query params: score=true to also generate predictions for the imported records
+    Valid rows are inserted in chunked transactions; invalid rows are reported per row
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = get_current_user()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        try:
+            rows = _read_import_rows()
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        max_rows = current_app.config['HEALTH_IMPORT_MAX_ROWS']
+        chunk_size = current_app.config['HEALTH_IMPORT_CHUNK_SIZE']
+        score = request.args.get('score', 'false').lower() == 'true'
+        
+        if not rows:
+            return jsonify({'error': 'No health records to import'}), 400
+        if len(rows) > max_rows:
+            return jsonify({'error': f'Import cannot exceed {max_rows} health records'}), 400
+        
+        # Load ML models up front so nothing is inserted if scoring can't run
+        if score:
+            try:
+                ml_service.load_models()
+            except Exception as e:
+                return jsonify({
+                    'error': 'ML models not available',
+                    'message': 'Please train the models first by running: python scripts/train_models.py',
+                    'details': str(e)
+                }), 503
+        
+        # Validate every row and calculate BMI in one vectorized pass
+        columns, errors = validate_health_records_batch(rows)
+        bmi = HealthRecord.calculate_bmi_batch(columns['weight'], columns['height'])
+        
+        valid_rows = [i for i in range(len(rows)) if i not in errors]
+        health_record_ids = []
+        predictions_created = 0
+        
+        for start in range(0, len(valid_rows), chunk_size):
+            chunk = valid_rows[start:start + chunk_size]
+            values = [
+                {
+                    'user_id': user.id,
+                    'height': float(columns['height'][i]),
+                    'weight': float(columns['weight'][i]),
+                    'bmi': float(bmi[i]),
+                    'blood_pressure_systolic': int(columns['blood_pressure_systolic'][i]),
+                    'blood_pressure_diastolic': int(columns['blood_pressure_diastolic'][i]),
+                    'blood_sugar': float(columns['blood_sugar'][i]),
+                    'lifestyle_habits': rows[i].get('lifestyle_habits')
+                }
+                for i in chunk
+            ]
+            
+            try:
+                ids = db.session.scalars(
+                    insert(HealthRecord).returning(HealthRecord.id, sort_by_parameter_order=True),
+                    values
+                ).all()
+                UserHealthSummary.add_health_records(user.id, len(ids), float(bmi[chunk].sum()))
+                
+                if score:
+                    predictions_created += _score_imported_records(user, ids, values)
+                
+                db.session.commit()
+                health_record_ids.extend(ids)
+                
+            except Exception as e:
+                db.session.rollback()
+                errors.update({i: f'Failed to save health record: {e}' for i in chunk})
+        
+        response = {
+            'imported': len(health_record_ids),
+            'failed': len(errors),
+            'health_record_ids': health_record_ids,
+            'errors': [{'row': i, 'error': errors[i]} for i in sorted(errors)]
+        }
+        if score:
+            response['predictions_created'] = predictions_created
+        
+        if not health_record_ids:
+            return jsonify({'error': 'No health records imported', **response}), 400
+        
+        return jsonify({'message': 'Health records imported successfully', **response}), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to import health records', 'message': str(e)}), 500
+
+def _read_import_rows():
+    """Parse import rows from a JSON array or CSV upload; raises ValueError if unreadable"""
+    upload = request.files.get('file')
+    
+    if upload is not None or request.mimetype == 'text/csv':
+        text = upload.read().decode('utf-8-sig') if upload is not None else request.get_data(as_text=True)
+        return [
+            {key: _parse_csv_value(key, value) for key, value in row.items() if key and value not in (None, '')}
+            for row in csv.DictReader(io.StringIO(text))
+        ]
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of health records or a CSV upload')
+    return data
+
+def _parse_csv_value(key, value):
+    """Convert a CSV cell to int or float where possible, as JSON would decode it"""
+    value = value.strip()
+    if key == 'lifestyle_habits':
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+def _score_imported_records(user, ids, values):
+    """Generate predictions for newly inserted records (caller commits)"""
+    health_records = [HealthRecord(id=record_id, **row) for record_id, row in zip(ids, values)]
+    results = prediction_pipeline.score_records(health_records, [user] * len(health_records))
+    
+    predictions = [
+        prediction_pipeline.build_prediction(user.id, health_record, result)
+        for health_record, result in zip(health_records, results)
+    ]
+    
+    db.session.add_all(predictions)
+    db.session.flush()
+    UserHealthSummary.add_predictions(user.id, predictions)
+    return len(predictions)
+
 @bp.route('/records', methods=['GET'])
 @jwt_required()
 def get_health_records():
@@ -91,17 +245,43 @@ def get_health_records():
     try:
         user_id = get_jwt_identity()
         
+        # Cursor mode (opt-in): ?cursor=<created_at,id>&limit=N, empty cursor for the first page
+        if 'cursor' in request.args:
+            is_valid, limit = validate_limit(request.args.get('limit', type=int))
+            if not is_valid:
+                return jsonify({'error': limit}), 400
+            
+            # Plain rows: no ORM objects to build for a read-only page
+            query = HealthRecord.row_query().filter(HealthRecord.user_id == user_id)
+            
+            try:
+                items, next_cursor = keyset_page(query, HealthRecord, request.args['cursor'], limit)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            
+            response = {
+                'health_records': [HealthRecord.serialize(record) for record in items],
+                'limit': limit,
+                'next_cursor': next_cursor
+            }
+            
+            # Count is optional in cursor mode
+            if request.args.get('include_total', 'false').lower() == 'true':
+                response['total'] = query.count()
+            
+            return jsonify(response), 200
+        
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        # Query health records with pagination
-        pagination = HealthRecord.query.filter_by(user_id=user_id).order_by(
+        # Query health records with pagination (plain rows)
+        pagination = HealthRecord.row_query().filter(HealthRecord.user_id == user_id).order_by(
             HealthRecord.created_at.desc()
         ).paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'health_records': [record.to_dict() for record in pagination.items],
+            'health_records': [HealthRecord.serialize(record) for record in pagination.items],
             'total': pagination.total,
             'page': page,
             'per_page': per_page,
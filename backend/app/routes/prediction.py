@@ -1,12 +1,17 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
-from app.models.user import User
 from app.models.health_record import HealthRecord
 from app.models.prediction import Prediction
+from app.models.user_health_summary import UserHealthSummary
+from app.models.prediction_job import PredictionJob
 from app.services.ml_service import ml_service
 from app.services.risk_scorer import risk_scorer
-from app.services.recommendation_engine import recommendation_engine
+from app.services.prediction_pipeline import prediction_pipeline
+from app.services.prediction_queue import prediction_queue
+from app.services.metrics import PREDICTION_STAGE_DURATION
+from app.utils.decorators import get_current_user
+from app.utils.pagination import keyset_page, validate_limit
 
 bp = Blueprint('prediction', __name__, url_prefix='/api')
 
@@ -15,11 +20,12 @@ bp = Blueprint('prediction', __name__, url_prefix='/api')
 def create_prediction():
     """
     Generate health risk prediction from health record
-    Expected JSON: {health_record_id}
+    Expected JSON: {health_record_id, async (optional)}
+    With async, the prediction is queued and 202 is returned with a job to poll
     """
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
@@ -32,6 +38,10 @@ def create_prediction():
         
         health_record_id = data['health_record_id']
         
+        run_async = data.get('async', current_app.config['PREDICTION_ASYNC_DEFAULT'])
+        if not isinstance(run_async, bool):
+            return jsonify({'error': 'async must be true or false'}), 400
+        
         # Get health record
         health_record = HealthRecord.query.filter_by(
             id=health_record_id, 
@@ -41,9 +51,21 @@ def create_prediction():
         if not health_record:
             return jsonify({'error': 'Health record not found'}), 404
         
+        # Queue for a prediction worker instead of scoring on the request thread
+        if run_async:
+            job = prediction_queue.enqueue(user.id, health_record.id)
+            db.session.commit()
+            
+            return jsonify({
+                'message': 'Prediction queued',
+                'job': job.to_dict(),
+                'status_url': f'/api/predict/jobs/{job.id}'
+            }), 202
+        
         # Load ML models if not already loaded
         try:
-            ml_service.load_models()
+            with PREDICTION_STAGE_DURATION.time('model_load'):
+                ml_service.load_models()
         except Exception as e:
             return jsonify({
                 'error': 'ML models not available',
@@ -51,42 +73,22 @@ def create_prediction():
                 'details': str(e)
             }), 503
         
-        # Get ML predictions
-        ml_results = ml_service.predict_all_risks(health_record, user)
-        
-        diabetes_risk = ml_results['diabetes']['risk']
-        heart_risk = ml_results['heart_disease']['risk']
-        obesity_risk = ml_results['obesity']['risk']
+        # Get ML predictions, risk score and recommendations
+        result = prediction_pipeline.score_records([health_record], [user])[0]
         
-        # Calculate overall risk score
-        overall_risk_score = risk_scorer.calculate_overall_risk_score(
-            diabetes_risk, heart_risk, obesity_risk, health_record.bmi
-        )
-        
-        # Classify risk
-        risk_category = risk_scorer.classify_risk(overall_risk_score)
-        
-        # Generate recommendations
-        recommendations = recommendation_engine.generate_recommendations(
-            diabetes_risk, heart_risk, obesity_risk, health_record.bmi, risk_category
-        )
+        diabetes_risk = result['ml_results']['diabetes']['risk']
+        heart_risk = result['ml_results']['heart_disease']['risk']
+        obesity_risk = result['ml_results']['obesity']['risk']
+        risk_category = result['risk_category']
         
         # Create prediction record
-        prediction = Prediction(
-            user_id=user_id,
-            health_record_id=health_record_id,
-            diabetes_risk=diabetes_risk,
-            heart_disease_risk=heart_risk,
-            obesity_risk=obesity_risk,
-            overall_risk_score=overall_risk_score,
-            risk_category=risk_category
-        )
-        
-        prediction.set_recommendations(recommendations)
-        prediction.set_models_used(ml_results['models_used'])
+        prediction = prediction_pipeline.build_prediction(user_id, health_record, result)
         
-        db.session.add(prediction)
-        db.session.commit()
+        with PREDICTION_STAGE_DURATION.time('db_commit'):
+            db.session.add(prediction)
+            db.session.flush()
+            UserHealthSummary.add_predictions(user_id, [prediction])
+            db.session.commit()
         
         # Generate risk explanation
         explanation = risk_scorer.generate_risk_explanation(
@@ -104,6 +106,112 @@ def create_prediction():
         db.session.rollback()
         return jsonify({'error': 'Failed to generate prediction', 'message': str(e)}), 500
 
+@bp.route('/predict/batch', methods=['POST'])
+@jwt_required()
+def create_predictions_batch():
+    """
+    Generate predictions for many health records in one pass
+    Expected JSON: {health_record_ids: [..]}
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = get_current_user()
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        data = request.get_json()
+        
+        # Validate required fields
+        if not data or 'health_record_ids' not in data:
+            return jsonify({'error': 'Missing required field: health_record_ids'}), 400
+        
+        health_record_ids = data['health_record_ids']
+        max_batch_size = current_app.config['PREDICTION_BATCH_MAX_SIZE']
+        
+        if not isinstance(health_record_ids, list) or not health_record_ids or \
+                not all(isinstance(i, int) and not isinstance(i, bool) for i in health_record_ids):
+            return jsonify({'error': 'health_record_ids must be a non-empty list of integers'}), 400
+        
+        # Drop duplicates, keep request order
+        health_record_ids = list(dict.fromkeys(health_record_ids))
+        
+        if len(health_record_ids) > max_batch_size:
+            return jsonify({'error': f'Batch size cannot exceed {max_batch_size} health records'}), 400
+        
+        # Get all health records in one query
+        records_by_id = {
+            record.id: record
+            for record in HealthRecord.query.filter(
+                HealthRecord.user_id == user_id,
+                HealthRecord.id.in_(health_record_ids)
+            ).all()
+        }
+        health_records = [records_by_id[i] for i in health_record_ids if i in records_by_id]
+        not_found = [i for i in health_record_ids if i not in records_by_id]
+        
+        if not health_records:
+            return jsonify({'error': 'Health records not found', 'not_found': not_found}), 404
+        
+        # Load ML models if not already loaded
+        try:
+            with PREDICTION_STAGE_DURATION.time('model_load'):
+                ml_service.load_models()
+        except Exception as e:
+            return jsonify({
+                'error': 'ML models not available',
+                'message': 'Please train the models first by running: python scripts/train_models.py',
+                'details': str(e)
+            }), 503
+        
+        # Score every record with one predict_proba call per model
+        results = prediction_pipeline.score_records(health_records, [user] * len(health_records))
+        
+        predictions = [
+            prediction_pipeline.build_prediction(user_id, health_record, result)
+            for health_record, result in zip(health_records, results)
+        ]
+        
+        # Insert all predictions in one transaction (one INSERT statement)
+        with PREDICTION_STAGE_DURATION.time('db_commit'):
+            db.session.add_all(predictions)
+            db.session.flush()
+            UserHealthSummary.add_predictions(user_id, predictions)
+            # Serialize before commit expires the predictions (each would be reloaded on its own)
+            prediction_dicts = [prediction.to_dict() for prediction in predictions]
+            db.session.commit()
+        
+        return jsonify({
+            'message': 'Predictions generated successfully',
+            'predictions': prediction_dicts,
+            'total': len(predictions),
+            'not_found': not_found,
+            'disclaimer': 'This prediction is for informational purposes only and should not replace professional medical advice.'
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to generate predictions', 'message': str(e)}), 500
+
+@bp.route('/predict/jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def get_prediction_job(job_id):
+    """Get status of a queued prediction, with the prediction once completed"""
+    try:
+        user_id = get_jwt_identity()
+        
+        job = PredictionJob.query.filter_by(id=job_id, user_id=user_id).first()
+        
+        if not job:
+            return jsonify({'error': 'Prediction job not found'}), 404
+        
+        return jsonify({
+            'job': job.to_dict()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to fetch prediction job', 'message': str(e)}), 500
+
 @bp.route('/predictions', methods=['GET'])
 @jwt_required()
 def get_predictions():
@@ -111,17 +219,43 @@ def get_predictions():
     try:
         user_id = get_jwt_identity()
         
+        # Cursor mode (opt-in): ?cursor=<created_at,id>&limit=N, empty cursor for the first page
+        if 'cursor' in request.args:
+            is_valid, limit = validate_limit(request.args.get('limit', type=int))
+            if not is_valid:
+                return jsonify({'error': limit}), 400
+            
+            # Plain rows: no ORM objects to build for a read-only page
+            query = Prediction.row_query().filter(Prediction.user_id == user_id)
+            
+            try:
+                items, next_cursor = keyset_page(query, Prediction, request.args['cursor'], limit)
+            except ValueError:
+                return jsonify({'error': 'Invalid cursor'}), 400
+            
+            response = {
+                'predictions': [Prediction.serialize(pred) for pred in items],
+                'limit': limit,
+                'next_cursor': next_cursor
+            }
+            
+            # Count is optional in cursor mode
+            if request.args.get('include_total', 'false').lower() == 'true':
+                response['total'] = query.count()
+            
+            return jsonify(response), 200
+        
         # Get pagination parameters
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        # Query predictions with pagination
-        pagination = Prediction.query.filter_by(user_id=user_id).order_by(
+        # Query predictions with pagination (plain rows)
+        pagination = Prediction.row_query().filter(Prediction.user_id == user_id).order_by(
             Prediction.created_at.desc()
         ).paginate(page=page, per_page=per_page, error_out=False)
         
         return jsonify({
-            'predictions': [pred.to_dict() for pred in pagination.items],
+            'predictions': [Prediction.serialize(pred) for pred in pagination.items],
             'total': pagination.total,
             'page': page,
             'per_page': per_page,
@@ -1,8 +1,13 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+import csv
+import io
+import json
+from flask import Blueprint, request, jsonify, Response, stream_with_context, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from app import db
 from app.models.user import User
 from app.models.health_record import HealthRecord
+from app.models.prediction import Prediction
+from app.services.user_cache import user_cache
 from app.utils.validators import validate_age, validate_gender
 
 bp = Blueprint('profile', __name__, url_prefix='/api/profile')
@@ -13,13 +18,13 @@ def get_profile():
     """Get current user's profile"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
         return jsonify({
-            'user': user.to_dict()
+            'user': User.serialize(user)
         }), 200
         
     except Exception as e:
@@ -68,10 +73,18 @@ def update_profile():
         
         db.session.commit()
         
-        return jsonify({
+        response = {
             'message': 'Profile updated successfully',
             'user': user.to_dict()
-        }), 200
+        }
+        
+        # Tokens carrying user claims are reissued so they reflect the update
+        if user_cache.jwt_claims:
+            response['access_token'] = create_access_token(
+                identity=user.id, additional_claims=user_cache.token_claims(user)
+            )
+        
+        return jsonify(response), 200
         
     except Exception as e:
         db.session.rollback()
@@ -83,18 +96,138 @@ def get_health_history():
     """Get user's health history (health records and predictions)"""
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = user_cache.get(user_id)
         
         if not user:
             return jsonify({'error': 'User not found'}), 404
         
-        # Get health records
-        health_records = HealthRecord.query.filter_by(user_id=user_id).order_by(HealthRecord.created_at.desc()).all()
+        # Get health records (plain rows)
+        health_records = HealthRecord.row_query().filter(
+            HealthRecord.user_id == user_id
+        ).order_by(HealthRecord.created_at.desc()).all()
         
         return jsonify({
-            'health_records': [record.to_dict() for record in health_records],
+            'health_records': [HealthRecord.serialize(record) for record in health_records],
             'total_records': len(health_records)
         }), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch health history', 'message': str(e)}), 500
+
+# Export row batch size: rows fetched per round trip and rows per yielded chunk
+EXPORT_BATCH_SIZE = 500
+
+# Flat CSV columns per export type
+EXPORT_COLUMNS = {
+    'health_records': [
+        'id', 'created_at', 'height', 'weight', 'bmi', 'blood_pressure_systolic',
+        'blood_pressure_diastolic', 'blood_sugar', 'lifestyle_habits'
+    ],
+    'predictions': [
+        'id', 'created_at', 'health_record_id', 'diabetes_risk', 'heart_disease_risk', 'obesity_risk',
+        'overall_risk_score', 'risk_category', 'recommendations', 'models_used'
+    ]
+}
+
+EXPORT_MODELS = {
+    'health_records': HealthRecord,
+    'predictions': Prediction
+}
+
+@bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_history():
+    """
+    Stream the user's full history as NDJSON or CSV
+    Query params: type (health_records|predictions), format (ndjson|csv)
+    Rows are read in batches from a server-side cursor, so memory use is constant
+    """
+    try:
+        user_id = get_jwt_identity()
+        user = user_cache.get(user_id)
+        
+        if not user:
+            return jsonify({'error': 'User not found'}), 404
+        
+        export_type = request.args.get('type', 'health_records')
+        export_format = request.args.get('format', 'ndjson')
+        
+        if export_type not in EXPORT_MODELS:
+            return jsonify({'error': f'type must be one of: {", ".join(EXPORT_MODELS)}'}), 400
+        if export_format not in ('ndjson', 'csv'):
+            return jsonify({'error': 'format must be one of: ndjson, csv'}), 400
+        
+        model = EXPORT_MODELS[export_type]
+        query = model.query.filter_by(user_id=user_id).order_by(
+            model.created_at.desc()
+        ).yield_per(EXPORT_BATCH_SIZE)
+        
+        if export_format == 'csv':
+            rows = _export_csv(query, EXPORT_COLUMNS[export_type])
+            mimetype = 'text/csv'
+        else:
+            rows = _export_ndjson(query)
+            mimetype = 'application/x-ndjson'
+        
+        return Response(
+            stream_with_context(rows),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={export_type}.{export_format}'}
+        )
+        
+    except Exception as e:
+        return jsonify({'error': 'Failed to export health history', 'message': str(e)}), 500
+
+def _export_ndjson(query):
+    """Yield one JSON document per line: the first row immediately, then chunks of EXPORT_BATCH_SIZE rows"""
+    items = iter(query)
+    first = next(items, None)
+    if first is None:
+        return
+    yield current_app.json.dumps(first.to_dict()) + '\n'
+    
+    chunk = []
+    for item in items:
+        chunk.append(current_app.json.dumps(item.to_dict()))
+        if len(chunk) >= EXPORT_BATCH_SIZE:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+def _export_csv(query, columns):
+    """Yield the CSV header immediately, then rows in chunks of EXPORT_BATCH_SIZE"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    count = 0
+    for item in query:
+        writer.writerow([_csv_value(_export_value(item, column)) for column in columns])
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _export_value(item, column):
+    """Column value for export; stored JSON columns are decoded and re-encoded"""
+    if column in ('recommendations', 'models_used'):
+        value = getattr(item, f'get_{column}')()
+        return json.dumps(value) if value is not None else None
+    return getattr(item, column)
+
+def _csv_value(value):
+    """Format a column value for CSV"""
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
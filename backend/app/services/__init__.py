@@ -1 +1 @@
-__all__ = ['ml_service', 'risk_scorer', 'recommendation_engine']
+__all__ = ['ml_service', 'risk_scorer', 'recommendation_engine', 'prediction_pipeline', 'prediction_cache', 'prediction_queue', 'user_cache', 'password_hasher', 'login_limiter', 'db_metrics', 'metrics']
@@ -0,0 +1,124 @@
+import threading
+import time
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+class RequestDatabaseStats:
+    """Database work done while handling one request"""
+
+    __slots__ = ('queries', 'query_time', 'pool_wait')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.pool_wait = 0.0
+
+class DatabaseMetrics:
+    """
+    Per-request and per-process database instrumentation
+    Counts queries and their time with engine events and pool checkout waits with
+    TimedQueuePool. Each response gets Server-Timing and X-DB-Queries headers, and
+    requests over DB_QUERY_WARN_COUNT queries or DB_POOL_WAIT_WARN_MS of pool wait
+    are logged as warnings, so N+1 patterns and pool starvation stand out
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.query_warn_count = 25
+        self.pool_wait_warn = 0.1
+        self.queries = 0
+        self.query_time = 0.0
+        self.checkouts = 0
+        self.pool_wait = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app, engine):
+        """Instrument engine and app's requests (DB_INSTRUMENTATION)"""
+        self.enabled = app.config.get('DB_INSTRUMENTATION', True)
+        self.query_warn_count = app.config.get('DB_QUERY_WARN_COUNT', 25)
+        self.pool_wait_warn = app.config.get('DB_POOL_WAIT_WARN_MS', 100) / 1000
+        if not self.enabled:
+            return
+
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def _request_stats(self):
+        return g.get('db_stats') if has_request_context() else None
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._record_query(time.perf_counter() - conn.info['query_start'].pop())
+
+    def _handle_error(self, exception_context):
+        # Failed statements never reach after_cursor_execute
+        starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+        if starts:
+            self._record_query(time.perf_counter() - starts.pop())
+
+    def _record_query(self, elapsed):
+        with self._lock:
+            self.queries += 1
+            self.query_time += elapsed
+
+        stats = self._request_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.query_time += elapsed
+
+    def record_pool_wait(self, elapsed):
+        """Time a pool checkout spent waiting for (or opening) a connection"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self.checkouts += 1
+            self.pool_wait += elapsed
+
+        stats = self._request_stats()
+        if stats is not None:
+            stats.pool_wait += elapsed
+
+    def _start_request(self):
+        g.db_stats = RequestDatabaseStats()
+
+    def _finish_request(self, response):
+        """Report the request's database work (streamed bodies only count work before streaming)"""
+        stats = g.get('db_stats')
+        if stats is None:
+            return response
+
+        response.headers['X-DB-Queries'] = str(stats.queries)
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={stats.query_time * 1000:.2f};desc="{stats.queries} queries", '
+            f'db-pool;dur={stats.pool_wait * 1000:.2f}'
+        )
+
+        log = current_app.logger.warning if (
+            stats.queries > self.query_warn_count or stats.pool_wait > self.pool_wait_warn
+        ) else current_app.logger.debug
+        log(
+            '%s %s: %d queries, %.1fms in database, %.1fms waiting for a connection',
+            request.method, request.path, stats.queries, stats.query_time * 1000, stats.pool_wait * 1000
+        )
+        return response
+
+    def stats(self):
+        """Totals for this process (times in milliseconds)"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'queries': self.queries,
+                'query_time_ms': round(self.query_time * 1000, 2),
+                'checkouts': self.checkouts,
+                'pool_wait_ms': round(self.pool_wait * 1000, 2)
+            }
+
+# Global database metrics instance
+db_metrics = DatabaseMetrics()
@@ -0,0 +1,208 @@
+import os
+import hmac
+import hashlib
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from app.services.prediction_cache import MemoryCacheBackend
+
+class MemoryBucketBackend:
+    """In-process token buckets; the least recently used buckets are dropped past max_keys"""
+
+    def __init__(self, max_keys):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        """Take a token from key's bucket; returns seconds until one is available (0 if taken)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_rate
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def size(self):
+        return len(self._buckets)
+
+class SQLiteBucketBackend:
+    """
+    Token buckets stored in a local SQLite file, shared by every worker process on the node
+    Buckets idle long enough to have refilled are deleted as new ones are written
+    """
+
+    def __init__(self, path, max_keys):
+        self.path = path
+        self.max_keys = max_keys
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread (and per process, since it is opened lazily after fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS login_buckets '
+                '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL, full_at REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_login_buckets_full_at ON login_buckets (full_at)')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def take(self, key, capacity, refill_rate):
+        """Take a token from key's bucket; returns seconds until one is available (0 if taken)"""
+        conn = self._connection()
+        now = time.time()
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated_at FROM login_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * refill_rate)
+
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / refill_rate
+
+            conn.execute(
+                'INSERT OR REPLACE INTO login_buckets (key, tokens, updated_at, full_at) VALUES (?, ?, ?, ?)',
+                (key, tokens, now, now + (capacity - tokens) / refill_rate)
+            )
+            if row is None:
+                conn.execute('DELETE FROM login_buckets WHERE full_at < ?', (now,))
+                conn.execute(
+                    'DELETE FROM login_buckets WHERE key IN ('
+                    'SELECT key FROM login_buckets ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+                    (self.max_keys,)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def clear(self):
+        self._connection().execute('DELETE FROM login_buckets')
+
+    def size(self):
+        return self._connection().execute('SELECT COUNT(*) FROM login_buckets').fetchone()[0]
+
+class LoginLimiter:
+    """
+    Guards /api/auth/login before it reaches the database and bcrypt
+    Each attempt takes a token from the client IP's bucket and the email's bucket;
+    attempts that find either empty are rejected until it refills. Failed logins are
+    remembered for LOGIN_FAILURE_CACHE_TTL seconds so repeats are refused without a lookup
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.failures = None
+        self.secret = b''
+        self.ip_capacity = 20
+        self.ip_refill_rate = 20 / 60
+        self.email_capacity = 5
+        self.email_refill_rate = 5 / 60
+        self.limited = 0
+        self.failure_hits = 0
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Create the configured bucket backend (LOGIN_RATE_LIMIT_BACKEND: memory, sqlite or none)"""
+        backend = app.config.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+        max_keys = app.config.get('LOGIN_RATE_LIMIT_MAX_KEYS', 100000)
+
+        if backend == 'memory':
+            self.backend = MemoryBucketBackend(max_keys)
+        elif backend == 'sqlite':
+            path = app.config.get('LOGIN_RATE_LIMIT_PATH') or \
+                os.path.join(app.instance_path, 'login_rate_limit.db')
+            self.backend = SQLiteBucketBackend(path, max_keys)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Invalid LOGIN_RATE_LIMIT_BACKEND: {backend}")
+
+        self.ip_capacity = app.config.get('LOGIN_RATE_LIMIT_IP_BURST', 20)
+        self.ip_refill_rate = app.config.get('LOGIN_RATE_LIMIT_IP_PER_MINUTE', 20) / 60
+        self.email_capacity = app.config.get('LOGIN_RATE_LIMIT_EMAIL_BURST', 5)
+        self.email_refill_rate = app.config.get('LOGIN_RATE_LIMIT_EMAIL_PER_MINUTE', 5) / 60
+        if self.ip_refill_rate <= 0 or self.email_refill_rate <= 0:
+            raise ValueError("LOGIN_RATE_LIMIT_*_PER_MINUTE must be positive")
+
+        ttl = app.config.get('LOGIN_FAILURE_CACHE_TTL', 30)
+        self.failures = MemoryCacheBackend(max_keys, ttl) if ttl > 0 else None
+        self.secret = app.config['SECRET_KEY'].encode()
+
+    def check(self, email, ip):
+        """Seconds the client must wait before this attempt is allowed (0 if it may proceed)"""
+        if self.backend is None:
+            return 0.0
+
+        wait = self.backend.take(f'ip:{ip}', self.ip_capacity, self.ip_refill_rate)
+        if not wait:
+            wait = self.backend.take(f'email:{email}', self.email_capacity, self.email_refill_rate)
+
+        if wait:
+            with self._stats_lock:
+                self.limited += 1
+        return wait
+
+    def _failure_key(self, email, password):
+        # Keyed digest, so neither passwords nor plain hashes of them are kept in memory
+        return hmac.new(self.secret, f'{email}\0{password}'.encode(), hashlib.sha256).hexdigest()
+
+    def recently_failed(self, email, password):
+        """Whether this email and password already failed within LOGIN_FAILURE_CACHE_TTL"""
+        if self.failures is None:
+            return False
+
+        if self.failures.get(self._failure_key(email, password)) is None:
+            return False
+
+        with self._stats_lock:
+            self.failure_hits += 1
+        return True
+
+    def record_failure(self, email, password):
+        """
+        Remember a failed email and password pair
+        Unknown emails are cached per pair too: the cache is per process, so a whole-email
+        entry would keep refusing an email registered since through another worker
+        """
+        if self.failures is not None:
+            self.failures.set(self._failure_key(email, password), True)
+
+    def stats(self):
+        """Counters for this process"""
+        return {
+            'backend': type(self.backend).__name__ if self.backend is not None else None,
+            'buckets': self.backend.size() if self.backend is not None else 0,
+            'limited': self.limited,
+            'cached_failures': self.failures.size() if self.failures is not None else 0,
+            'failure_cache_hits': self.failure_hits
+        }
+
+# Global login limiter instance
+login_limiter = LoginLimiter()
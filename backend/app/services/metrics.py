@@ -0,0 +1,244 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from bisect import bisect_left
+from flask import Response, g, request
+
+# Latency buckets in seconds (upper bounds; +Inf is implied)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _format_value(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        if math.isnan(value):
+            return 'NaN'
+    return repr(value) if isinstance(value, float) else str(value)
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in sorted(values)]
+
+class Histogram:
+    """Observation counts in cumulative buckets, plus sum and count, per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (last is +Inf), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the duration of the with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def samples(self):
+        with self._lock:
+            series = [(key, list(counts), total) for key, (counts, total) in self._series.items()]
+
+        samples = []
+        for key, counts, total in sorted(series):
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append((f'{self.name}_bucket', {**labels, 'le': _format_value(float(bound))}, cumulative))
+            samples.append((f'{self.name}_sum', labels, total))
+            samples.append((f'{self.name}_count', labels, cumulative))
+        return samples
+
+class MetricsRegistry:
+    """
+    Metrics for this process in the Prometheus text exposition format
+    Hot paths record into counters and histograms; collectors read the stats
+    other services already keep (caches, pools, models) at scrape time
+    """
+
+    def __init__(self):
+        self._metrics = []
+        self._collectors = []
+
+    def counter(self, name, documentation, labelnames=()):
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector):
+        """
+        Add a callable returning metric families for each scrape:
+        [(name, kind, documentation, [(sample name, labels, value), ...]), ...]
+        """
+        self._collectors.append(collector)
+
+    def init_app(self, app):
+        """Time every request and serve GET /metrics (METRICS_ENABLED)"""
+        if not app.config.get('METRICS_ENABLED', True):
+            return
+
+        if collect_service_metrics not in self._collectors:
+            self.register_collector(collect_service_metrics)
+
+        @app.before_request
+        def start_request_timer():
+            g.request_start = time.perf_counter()
+
+        @app.after_request
+        def record_request(response):
+            start = g.get('request_start')
+            if start is not None:
+                endpoint = request.endpoint or 'unmatched'
+                HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, endpoint, request.method)
+                HTTP_REQUESTS.inc(endpoint, request.method, str(response.status_code))
+            return response
+
+        @app.route('/metrics', methods=['GET'])
+        def metrics_endpoint():
+            return Response(self.render(), content_type=CONTENT_TYPE)
+
+    def families(self):
+        for metric in self._metrics:
+            yield metric.name, metric.kind, metric.documentation, metric.samples()
+        for collector in self._collectors:
+            yield from collector()
+
+    def render(self):
+        """Every metric as Prometheus text"""
+        lines = []
+        for name, kind, documentation, samples in self.families():
+            lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {kind}')
+            for sample_name, labels, value in samples:
+                lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+# Global metrics registry
+metrics = MetricsRegistry()
+
+HTTP_REQUESTS = metrics.counter(
+    'http_requests_total', 'HTTP requests by endpoint, method and status', ('endpoint', 'method', 'status')
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    'http_request_duration_seconds', 'HTTP request latency by endpoint and method', ('endpoint', 'method')
+)
+PREDICTION_STAGE_DURATION = metrics.histogram(
+    'prediction_stage_duration_seconds',
+    'Time spent in each stage of generating predictions (one observation per batch)', ('stage',)
+)
+MODEL_PREDICT_DURATION = metrics.histogram(
+    'ml_predict_proba_duration_seconds', 'predict_proba time per model and batch', ('condition', 'model')
+)
+
+def _gauge(name, documentation, value, labels=None):
+    return name, 'gauge', documentation, [] if value is None else [(name, labels or {}, value)]
+
+def _counter(name, documentation, samples):
+    return name, 'counter', documentation, [(name, labels, value) for labels, value in samples]
+
+def collect_service_metrics():
+    """Read the stats kept by the database, cache, model, micro-batching and auth services"""
+    from app.services.db_metrics import db_metrics
+    from app.services.ml_service import ml_service
+    from app.services.prediction_cache import prediction_cache
+    from app.services.user_cache import user_cache
+    from app.services.password_hasher import password_hasher
+    from app.services.login_limiter import login_limiter
+
+    yield _counter('db_queries_total', 'Database queries executed', [({}, db_metrics.queries)])
+    yield _counter('db_query_seconds_total', 'Time spent executing database queries', [({}, db_metrics.query_time)])
+    yield _counter('db_pool_checkouts_total', 'Connections checked out from the pool', [({}, db_metrics.checkouts)])
+    yield _counter('db_pool_wait_seconds_total', 'Time spent waiting for pool connections', [({}, db_metrics.pool_wait)])
+
+    caches = [('prediction', prediction_cache), ('user', user_cache)]
+    yield _counter('cache_hits_total', 'Cache hits', [({'cache': name}, cache.hits) for name, cache in caches])
+    yield _counter('cache_misses_total', 'Cache misses', [({'cache': name}, cache.misses) for name, cache in caches])
+    yield 'cache_entries', 'gauge', 'Entries held by each cache', [
+        ('cache_entries', {'cache': name}, cache.backend.size()) for name, cache in caches if cache.enabled
+    ]
+
+    yield _gauge('ml_models_loaded', 'Whether the ML models are loaded', int(ml_service.loaded))
+    yield _gauge('ml_model_load_seconds', 'Duration of the last ML model load', ml_service.load_seconds)
+    yield _gauge('ml_model_warmup_seconds', 'Duration of the ML model warmup', ml_service.warmup_seconds)
+
+    batcher = ml_service.micro_batcher
+    if batcher is not None:
+        batch_stats = batcher.stats()
+        counts = batch_stats['batch_size_histogram']
+        # Every power-of-two bound up to max_batch_size, seen or not, so each scrape has the same series
+        samples, cumulative, bound = [], 0, 1
+        while True:
+            cumulative += counts.get(str(bound), 0)
+            samples.append(('ml_micro_batch_size_bucket', {'le': str(bound)}, cumulative))
+            if bound >= batch_stats['max_batch_size']:
+                break
+            bound *= 2
+        samples.append(('ml_micro_batch_size_bucket', {'le': '+Inf'}, batch_stats['batches']))
+        samples.append(('ml_micro_batch_size_sum', {}, batch_stats['rows']))
+        samples.append(('ml_micro_batch_size_count', {}, batch_stats['batches']))
+        yield 'ml_micro_batch_size', 'histogram', 'Rows per micro-batched inference pass', samples
+
+    yield _counter('password_hash_tasks_total', 'Password hashes and checks run', [({}, password_hasher.tasks)])
+    yield _counter('password_hash_rejected_total', 'Password hashes and checks rejected with a full queue',
+                   [({}, password_hasher.rejected)])
+    yield _counter('password_hash_queue_seconds_total', 'Time password hashes and checks waited for a thread',
+                   [({}, password_hasher.queue_time_total)])
+    yield _counter('password_hash_seconds_total', 'Time spent hashing and checking passwords',
+                   [({}, password_hasher.run_time_total)])
+    yield _counter('password_rehash_failures_total', 'Failed upgrades of password hashes to the configured cost',
+                   [({}, password_hasher.rehash_failures)])
+    yield _gauge('password_hash_queued', 'Password hashes and checks waiting for a thread', password_hasher.queued)
+
+    yield _counter('login_rate_limited_total', 'Login attempts rejected by the rate limiter', [({}, login_limiter.limited)])
+    yield _counter('login_failure_cache_hits_total', 'Login attempts refused from the failed login cache',
+                   [({}, login_limiter.failure_hits)])
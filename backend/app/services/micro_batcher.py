@@ -0,0 +1,127 @@
+import os
+import queue
+import threading
+import time
+from collections import Counter
+
+class _PendingRequest:
+    """Feature rows from one caller, waiting for their share of a batch result"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.results = None
+        self.error = None
+        self.done = threading.Event()
+
+class MicroBatcher:
+    """
+    Coalesces concurrent inference calls into batches
+    Callers block in submit() while a background thread collects rows arriving
+    within max_wait_ms (or until max_batch_size rows), runs handler once on
+    all of them and hands each caller its slice of the results
+    """
+
+    def __init__(self, handler, max_batch_size=64, max_wait_ms=5.0):
+        self.handler = handler  # rows -> list of results, one per row
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._reset()
+
+        # The dispatcher thread doesn't survive fork; start a fresh one in the child on first use
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._queue = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.rows = 0
+        self.largest_batch = 0
+        self._batch_sizes = Counter()
+
+    def submit(self, rows):
+        """Run handler on rows as part of the next batch and return their results"""
+        self._ensure_started()
+
+        request = _PendingRequest(rows)
+        self._queue.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            raise request.error
+        return request.results
+
+    def _ensure_started(self):
+        """Start the dispatcher thread on first use (never at import, so forked workers each get their own)"""
+        if self._thread is not None:
+            return
+
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._queue = queue.Queue()
+            thread = threading.Thread(target=self._run, name='ml-micro-batcher', daemon=True)
+            thread.start()
+            self._thread = thread
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].rows)
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                size += len(request.rows)
+
+            self._dispatch(batch, size)
+
+    def _dispatch(self, batch, size):
+        """Run one handler call for the whole batch and fan the results out"""
+        try:
+            rows = [row for request in batch for row in request.rows]
+            results = self.handler(rows)
+
+            offset = 0
+            for request in batch:
+                request.results = results[offset:offset + len(request.rows)]
+                offset += len(request.rows)
+        except Exception as e:
+            for request in batch:
+                request.error = e
+        finally:
+            self._record(size)
+            for request in batch:
+                request.done.set()
+
+    def _record(self, size):
+        with self._stats_lock:
+            self.batches += 1
+            self.rows += size
+            self.largest_batch = max(self.largest_batch, size)
+            # Power-of-two buckets: key is the bucket's upper bound
+            self._batch_sizes[1 << (size - 1).bit_length()] += 1
+
+    def stats(self):
+        """Batch size metrics since startup"""
+        with self._stats_lock:
+            return {
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait_ms,
+                'batches': self.batches,
+                'rows': self.rows,
+                'mean_batch_size': round(self.rows / self.batches, 2) if self.batches else None,
+                'largest_batch': self.largest_batch,
+                'batch_size_histogram': {
+                    str(bound): count for bound, count in sorted(self._batch_sizes.items())
+                }
+            }
@@ -1,7 +1,49 @@
 import os
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import joblib
 import numpy as np
 from flask import current_app
+from app.services.micro_batcher import MicroBatcher
+from app.services.metrics import PREDICTION_STAGE_DURATION, MODEL_PREDICT_DURATION
+from app.services.native_scoring import compile_model, load_compiled
+
+logger = logging.getLogger(__name__)
+
+# Model feature order: age, bmi, bp_systolic, bp_diastolic, blood_sugar
+FEATURES = ['age', 'bmi', 'bp_systolic', 'bp_diastolic', 'blood_sugar']
+
+# Result key -> model file prefix
+CONDITIONS = {
+    'diabetes': 'diabetes',
+    'heart_disease': 'heart',
+    'obesity': 'obesity'
+}
+
+# Representative feature row used to warm up models after loading
+WARMUP_FEATURES = [[30, 25.0, 120, 80, 100.0]]
+
+# Model selection policy: Random Forest preferred, then Logistic Regression, then Decision Tree
+MODEL_PREFERENCE = ['rf', 'lr', 'dt']
+
+# Inference modes:
+#   best  - evaluate only the model the selection policy picks
+#   all   - evaluate every model on the request path
+#   audit - evaluate the selected model, compare against the others in the background
+INFERENCE_MODES = ('best', 'all', 'audit')
+
+# Inference backends:
+#   native  - score with flattened NumPy arrays (see native_scoring)
+#   sklearn - call the unpickled estimators directly
+INFERENCE_BACKENDS = ('native', 'sklearn')
+
+# Model artifact formats:
+#   pickle - {name}.pkl files written by joblib, unpickled per process
+#   npy    - npy/{name}/ array directories, memory-mapped read-only and shared by all workers
+MODEL_FORMATS = ('pickle', 'npy')
 
 class MLService:
     """Machine Learning prediction service"""
@@ -10,54 +52,206 @@ class MLService:
         self.models = {}
         self.scaler = None
         self.loaded = False
+        self.inference_mode = 'best'
+        self.inference_backend = 'native'
+        self.model_version = None
+        self.load_seconds = None
+        self.warmup_seconds = None
+        self._reload_listeners = []
+        self._lock = threading.Lock()
+        self._audit_executor = None
+        self.micro_batcher = None
     
-    def load_models(self):
-        """Load all trained ML models"""
-        if self.loaded:
+    def init_app(self, app):
+        """
+        Configure request micro-batching, then preload and warm up models
+        at startup when ML_PRELOAD_MODELS is set
+        """
+        if app.config.get('ML_MICRO_BATCH_ENABLED', False):
+            if self.micro_batcher is None:
+                self.micro_batcher = MicroBatcher(self._predict_rows)
+            self.micro_batcher.max_batch_size = app.config.get('ML_MICRO_BATCH_MAX_SIZE', 64)
+            self.micro_batcher.max_wait_ms = app.config.get('ML_MICRO_BATCH_MAX_WAIT_MS', 5.0)
+        else:
+            self.micro_batcher = None
+        
+        if not app.config.get('ML_PRELOAD_MODELS', True):
             return
         
+        with app.app_context():
+            try:
+                self.load_models()
+                self.warmup()
+            except Exception as e:
+                # Keep the API up; /api/predict retries loading and reports 503
+                print(f"Warning: ML models not preloaded: {str(e)}")
+    
+    def load_models(self, force=False):
+        """
+        Load all trained ML models
+        Thread-safe: concurrent callers wait for a single load
+        force reloads models even if already loaded
+        """
+        if self.loaded and not force:
+            return
+        
+        with self._lock:
+            if self.loaded and not force:
+                return
+            self._load_models()
+    
+    def _load_models(self):
+        """Load scaler and models, then swap them in together"""
         try:
+            start = time.perf_counter()
             models_path = current_app.config['ML_MODELS_PATH']
             
+            inference_mode = current_app.config.get('ML_INFERENCE_MODE', 'best')
+            if inference_mode not in INFERENCE_MODES:
+                raise ValueError(f"Invalid ML_INFERENCE_MODE: {inference_mode}")
+            
+            inference_backend = current_app.config.get('ML_INFERENCE_BACKEND', 'native')
+            if inference_backend not in INFERENCE_BACKENDS:
+                raise ValueError(f"Invalid ML_INFERENCE_BACKEND: {inference_backend}")
+            self.inference_backend = inference_backend
+            
+            model_format = current_app.config.get('ML_MODEL_FORMAT', 'pickle')
+            if model_format not in MODEL_FORMATS:
+                raise ValueError(f"Invalid ML_MODEL_FORMAT: {model_format}")
+            if model_format == 'npy' and inference_backend != 'native':
+                raise ValueError("ML_MODEL_FORMAT=npy requires ML_INFERENCE_BACKEND=native")
+            
+            digest = hashlib.sha256(model_format.encode())
+            
             # Load scaler
-            scaler_path = os.path.join(models_path, 'scaler.pkl')
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
-            else:
+            scaler = self._load_artifact(models_path, 'scaler', model_format, digest)
+            if scaler is None:
                 raise FileNotFoundError("Scaler not found. Please train models first.")
             
             # Load models for each condition and algorithm
-            conditions = ['diabetes', 'heart', 'obesity']
             algorithms = ['lr', 'dt', 'rf']
+            models = {}
             
-            for condition in conditions:
-                self.models[condition] = {}
+            for condition in CONDITIONS.values():
+                models[condition] = {}
                 for algo in algorithms:
-                    model_path = os.path.join(models_path, f'{condition}_{algo}.pkl')
-                    if os.path.exists(model_path):
-                        self.models[condition][algo] = joblib.load(model_path)
+                    model = self._load_artifact(models_path, f'{condition}_{algo}', model_format, digest)
+                    if model is not None:
+                        models[condition][algo] = model
                     else:
                         print(f"Warning: Model {condition}_{algo} not found")
             
+            self.scaler = scaler
+            self.models = models
+            self.inference_mode = inference_mode
+            self.model_version = digest.hexdigest()[:16]
+            self.load_seconds = time.perf_counter() - start
             self.loaded = True
-            print("✓ ML models loaded successfully")
+            print(f"✓ ML models loaded successfully in {self.load_seconds:.3f}s (version {self.model_version})")
+            
+            for listener in self._reload_listeners:
+                listener()
             
         except Exception as e:
             print(f"Error loading ML models: {str(e)}")
             raise
     
+    def warmup(self):
+        """Run one prediction through the scaler and every model"""
+        start = time.perf_counter()
+        
+        features = self.scaler.transform(np.array(WARMUP_FEATURES, dtype=float))
+        for condition_models in self.models.values():
+            for model in condition_models.values():
+                model.predict_proba(features)
+        
+        self.warmup_seconds = time.perf_counter() - start
+    
+    def status(self):
+        """Model loading state and timings"""
+        return {
+            'loaded': self.loaded,
+            'inference_backend': self.inference_backend,
+            'inference_mode': self.inference_mode,
+            'model_version': self.model_version,
+            'load_seconds': round(self.load_seconds, 4) if self.load_seconds is not None else None,
+            'warmup_seconds': round(self.warmup_seconds, 4) if self.warmup_seconds is not None else None,
+            'micro_batching': self.micro_batcher.stats() if self.micro_batcher else None
+        }
+    
+    def add_reload_listener(self, listener):
+        """Register a callback run after every (re)load of the models"""
+        self._reload_listeners.append(listener)
+    
+    def _load_artifact(self, models_path, name, model_format, digest):
+        """
+        Load one model or scaler in the given format, or None if missing
+        Artifact bytes are fed into digest to derive the model version
+        """
+        if model_format == 'npy':
+            artifact_path = os.path.join(models_path, 'npy', name)
+            if not os.path.exists(artifact_path):
+                return None
+            for filename in sorted(os.listdir(artifact_path)):
+                self._update_digest(digest, os.path.join(artifact_path, filename))
+            return load_compiled(artifact_path, mmap_mode='r')
+        
+        artifact_path = os.path.join(models_path, f'{name}.pkl')
+        if not os.path.exists(artifact_path):
+            return None
+        self._update_digest(digest, artifact_path)
+        return self._compile(joblib.load(artifact_path), name)
+    
+    @staticmethod
+    def _update_digest(digest, path):
+        """Hash a file's name and contents"""
+        digest.update(os.path.basename(path).encode())
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    
+    def _compile(self, model, name):
+        """Convert a loaded model to the native backend, keeping sklearn if unsupported"""
+        if self.inference_backend != 'native':
+            return model
+        
+        try:
+            return compile_model(model)
+        except TypeError as e:
+            print(f"Warning: {name} kept on sklearn backend: {str(e)}")
+            return model
+    
     def prepare_features(self, health_record, user):
         """
         Prepare features from health record for prediction
         Features: age, bmi, bp_systolic, bp_diastolic, blood_sugar
         """
-        features = np.array([[
+        return self.prepare_features_batch([health_record], [user])
+    
+    def prepare_features_batch(self, health_records, users):
+        """
+        Prepare one feature matrix for many health records
+        users is aligned with health_records (one user per record)
+        """
+        return self.scale_features([
+            self.feature_row(health_record, user)
+            for health_record, user in zip(health_records, users)
+        ])
+    
+    @staticmethod
+    def feature_row(health_record, user):
+        """Unscaled model features for one health record"""
+        return [
             user.age if user.age else 30,  # Default age if not provided
             health_record.bmi,
             health_record.blood_pressure_systolic,
             health_record.blood_pressure_diastolic,
             health_record.blood_sugar
-        ]])
+        ]
+    
+    def scale_features(self, feature_rows):
+        """Build the feature matrix from unscaled rows and apply the scaler"""
+        features = np.array(feature_rows, dtype=float).reshape(-1, len(FEATURES))
         
         # Scale features
         if self.scaler:
@@ -67,72 +261,130 @@ class MLService:
     
     def predict_single_condition(self, features, condition):
         """
-        Predict risk for a single condition using all algorithms
+        Predict risk for a single condition using the configured inference mode
         Returns best prediction and model name
         """
-        if condition not in self.models:
+        best_predictions, best_model, predictions = self.predict_condition_batch(features, condition)
+        
+        return best_predictions[0], best_model, {
+            algo_name: probs[0] for algo_name, probs in predictions.items()
+        }
+    
+    def select_model(self, condition):
+        """Return the algorithm the selection policy picks for a condition"""
+        if condition not in self.models or not self.models[condition]:
             raise ValueError(f"No models found for condition: {condition}")
         
+        for algo_name in MODEL_PREFERENCE:
+            if algo_name in self.models[condition]:
+                return algo_name
+        
+        return next(iter(self.models[condition]))
+    
+    def predict_condition_batch(self, features, condition):
+        """
+        Predict risk for a single condition over a whole feature matrix
+        Each evaluated model's predict_proba runs once for all rows
+        Returns best predictions array, model name and every evaluated model's predictions
+        """
+        best_model = self.select_model(condition)
+        
+        if self.inference_mode == 'all':
+            algorithms = list(self.models[condition])
+        else:
+            algorithms = [best_model]
+        
         predictions = {}
         
-        for algo_name, model in self.models[condition].items():
+        for algo_name in algorithms:
             # Get probability of positive class
-            prob = model.predict_proba(features)[0][1]
-            predictions[algo_name] = prob
-        
-        # Select best model (Random Forest preferred, then Logistic Regression, then Decision Tree)
-        if 'rf' in predictions:
-            best_model = 'rf'
-            best_prediction = predictions['rf']
-        elif 'lr' in predictions:
-            best_model = 'lr'
-            best_prediction = predictions['lr']
-        else:
-            best_model = 'dt'
-            best_prediction = predictions['dt']
+            with MODEL_PREDICT_DURATION.time(condition, algo_name):
+                predictions[algo_name] = self.models[condition][algo_name].predict_proba(features)[:, 1]
         
-        return best_prediction, best_model, predictions
+        if self.inference_mode == 'audit':
+            self._submit_audit(features, condition, best_model, predictions[best_model])
+        
+        return predictions[best_model], best_model, predictions
+    
+    def _submit_audit(self, features, condition, best_model, best_predictions):
+        """Compare the selected model against the others off the request path"""
+        if self._audit_executor is None:
+            self._audit_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ml-audit')
+        
+        self._audit_executor.submit(self._audit, features, condition, best_model, best_predictions)
+    
+    def _audit(self, features, condition, best_model, best_predictions):
+        """Log how far the non-selected models deviate from the selected one"""
+        try:
+            for algo_name, model in self.models[condition].items():
+                if algo_name == best_model:
+                    continue
+                
+                probs = model.predict_proba(features)[:, 1]
+                deviation = np.abs(probs - best_predictions)
+                disagreements = int(np.sum((probs > 0.5) != (best_predictions > 0.5)))
+                
+                logger.info(
+                    "ML audit %s: %s vs %s max_deviation=%.4f mean_deviation=%.4f disagreements=%d/%d",
+                    condition, algo_name, best_model, deviation.max(), deviation.mean(),
+                    disagreements, len(probs)
+                )
+        except Exception:
+            logger.exception("ML audit failed for %s", condition)
     
     def predict_all_risks(self, health_record, user):
         """
         Predict all health risks (diabetes, heart disease, obesity)
         Returns dictionary with predictions and model information
         """
+        return self.predict_all_risks_batch([health_record], [user])[0]
+    
+    def predict_all_risks_batch(self, health_records, users):
+        """
+        Predict all health risks for many health records at once
+        Returns one result dictionary per record, in input order
+        """
         if not self.loaded:
             self.load_models()
         
-        features = self.prepare_features(health_record, user)
-        
-        results = {
-            'diabetes': {},
-            'heart_disease': {},
-            'obesity': {},
-            'models_used': {}
-        }
-        
-        # Predict diabetes risk
-        diabetes_risk, diabetes_model, diabetes_all = self.predict_single_condition(features, 'diabetes')
-        results['diabetes'] = {
-            'risk': float(diabetes_risk),
-            'percentage': round(float(diabetes_risk) * 100, 2)
-        }
-        results['models_used']['diabetes'] = diabetes_model
-        
-        # Predict heart disease risk
-        heart_risk, heart_model, heart_all = self.predict_single_condition(features, 'heart')
-        results['heart_disease'] = {
-            'risk': float(heart_risk),
-            'percentage': round(float(heart_risk) * 100, 2)
-        }
-        results['models_used']['heart_disease'] = heart_model
+        return self.predict_rows([
+            self.feature_row(health_record, user)
+            for health_record, user in zip(health_records, users)
+        ])
+    
+    def predict_rows(self, feature_rows):
+        """
+        Predict all health risks for unscaled feature rows (models must be loaded)
+        With micro-batching enabled, rows from concurrent callers share one inference pass
+        """
+        if self.micro_batcher is None or not feature_rows:
+            return self._predict_rows(feature_rows)
+        return self.micro_batcher.submit(feature_rows)
+    
+    def _predict_rows(self, feature_rows):
+        with PREDICTION_STAGE_DURATION.time('feature_scaling'):
+            features = self.scale_features(feature_rows)
+        return self.predict_features_batch(features)
+    
+    def predict_features_batch(self, features):
+        """
+        Predict all health risks for a scaled feature matrix
+        Returns one result dictionary per row, in input order
+        """
+        results = [
+            {'diabetes': {}, 'heart_disease': {}, 'obesity': {}, 'models_used': {}}
+            for _ in range(len(features))
+        ]
         
-        # Predict obesity risk
-        obesity_risk, obesity_model, obesity_all = self.predict_single_condition(features, 'obesity')
-        results['obesity'] = {
-            'risk': float(obesity_risk),
-            'percentage': round(float(obesity_risk) * 100, 2)
-        }
-        results['models_used']['obesity'] = obesity_model
+        for result_key, condition in CONDITIONS.items():
+            risks, model_name, _ = self.predict_condition_batch(features, condition)
+            
+            for result, risk in zip(results, risks):
+                result[result_key] = {
+                    'risk': float(risk),
+                    'percentage': round(float(risk) * 100, 2)
+                }
+                result['models_used'][result_key] = model_name
         
         return results
 
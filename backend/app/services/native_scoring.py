@@ -0,0 +1,218 @@
+"""
+Native NumPy scoring engine for the trained scikit-learn models
+
+Loaded models are flattened into plain NumPy arrays and scored without
+sklearn's per-call input validation and joblib dispatch, which dominate
+latency for the single-row requests served by /api/predict.
+Outputs are bit-for-bit identical to sklearn's predict_proba/transform
+(see tests/test_native_scoring.py and scripts/check_native_parity.py).
+
+Compiled models can be saved as raw .npy arrays and loaded back with
+mmap_mode='r', so every worker process maps one shared, read-only copy.
+"""
+import os
+import json
+import numpy as np
+from scipy.special import expit
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+# sklearn trees compare features in float32
+TREE_DTYPE = np.float32
+
+class CompiledScaler:
+    """StandardScaler as mean/scale arrays"""
+    KIND = 'scaler'
+
+    def __init__(self, mean, scale):
+        self.mean = mean
+        self.scale = scale
+
+    def to_arrays(self):
+        return {'mean': self.mean, 'scale': self.scale}, {}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(arrays['mean'], arrays['scale'])
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        n_features = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+        return cls(np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64))
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+class CompiledLinearModel:
+    """Binary LogisticRegression as coefficient/intercept arrays"""
+    KIND = 'linear'
+
+    def __init__(self, coef, intercept, classes):
+        self.coef = coef
+        self.intercept = intercept
+        self.classes_ = classes
+
+    def to_arrays(self):
+        return {'coef': self.coef, 'intercept': self.intercept, 'classes': self.classes_}, {}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(arrays['coef'], arrays['intercept'], arrays['classes'])
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if len(model.classes_) != 2:
+            raise TypeError("Only binary LogisticRegression models can be compiled")
+        return cls(
+            np.asarray(model.coef_, dtype=np.float64),
+            np.asarray(model.intercept_, dtype=np.float64),
+            np.asarray(model.classes_)
+        )
+
+    def predict_proba(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        prob = (X @ self.coef.T + self.intercept).reshape(-1)
+        expit(prob, out=prob)
+        return np.vstack([1 - prob, prob]).T
+
+class CompiledTreeEnsemble:
+    """
+    Decision tree or random forest as flat node arrays
+    All trees share one node table; leaves point to themselves so every
+    row can be advanced max_depth times in lockstep across all trees
+    """
+    KIND = 'tree_ensemble'
+    ARRAYS = ('left', 'right', 'feature', 'threshold', 'value', 'roots')
+
+    def __init__(self, left, right, feature, threshold, value, roots, max_depth, classes):
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+
+    def to_arrays(self):
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        arrays['classes'] = self.classes_
+        return arrays, {'max_depth': self.max_depth}
+
+    @classmethod
+    def from_arrays(cls, arrays, meta):
+        return cls(
+            *(arrays[name] for name in cls.ARRAYS),
+            max_depth=meta['max_depth'],
+            classes=arrays['classes']
+        )
+
+    @classmethod
+    def from_sklearn(cls, model):
+        if isinstance(model, RandomForestClassifier):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        else:
+            trees = [model.tree_]
+
+        if model.n_outputs_ != 1:
+            raise TypeError("Only single-output tree models can be compiled")
+
+        left, right, feature, threshold, value, roots = [], [], [], [], [], []
+        offset = 0
+
+        for tree in trees:
+            node_ids = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+
+            left.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            right.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            threshold.append(tree.threshold)
+
+            # Leaf class counts normalized exactly as DecisionTreeClassifier.predict_proba does
+            proba = tree.value[:, 0, :model.n_classes_].copy()
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            value.append(proba)
+
+            roots.append(offset)
+            offset += tree.node_count
+
+        return cls(
+            np.concatenate(left).astype(np.intp),
+            np.concatenate(right).astype(np.intp),
+            np.concatenate(feature).astype(np.intp),
+            np.concatenate(threshold).astype(np.float64),
+            np.concatenate(value).astype(np.float64),
+            np.asarray(roots, dtype=np.intp),
+            max(tree.max_depth for tree in trees),
+            np.asarray(model.classes_)
+        )
+
+    def apply(self, X):
+        """Return the leaf node of every (tree, row) pair"""
+        X = np.asarray(X, dtype=TREE_DTYPE)
+        rows = np.arange(X.shape[0])[np.newaxis, :]
+        nodes = np.repeat(self.roots[:, np.newaxis], X.shape[0], axis=1)
+
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+
+        # Sum trees in order, then average, matching RandomForestClassifier
+        proba = self.value[leaves].sum(axis=0)
+        proba /= len(self.roots)
+        return proba
+
+def compile_model(model):
+    """Convert a fitted sklearn model or scaler into its native equivalent"""
+    if isinstance(model, StandardScaler):
+        return CompiledScaler.from_sklearn(model)
+    if isinstance(model, LogisticRegression):
+        return CompiledLinearModel.from_sklearn(model)
+    if isinstance(model, (DecisionTreeClassifier, RandomForestClassifier)):
+        return CompiledTreeEnsemble.from_sklearn(model)
+    raise TypeError(f"Unsupported model type for native scoring: {type(model).__name__}")
+
+COMPILED_KINDS = {
+    cls.KIND: cls for cls in (CompiledScaler, CompiledLinearModel, CompiledTreeEnsemble)
+}
+
+def save_compiled(compiled, directory):
+    """Write a compiled model as one .npy file per array plus meta.json"""
+    os.makedirs(directory, exist_ok=True)
+    arrays, meta = compiled.to_arrays()
+
+    for name, array in arrays.items():
+        np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array))
+
+    with open(os.path.join(directory, 'meta.json'), 'w') as f:
+        json.dump({'kind': compiled.KIND, 'arrays': sorted(arrays), **meta}, f)
+
+def load_compiled(directory, mmap_mode='r'):
+    """
+    Load a compiled model saved by save_compiled
+    With mmap_mode='r' arrays are mapped read-only and shared through the page cache
+    """
+    with open(os.path.join(directory, 'meta.json')) as f:
+        meta = json.load(f)
+
+    cls = COMPILED_KINDS[meta['kind']]
+    arrays = {
+        name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+        for name in meta['arrays']
+    }
+    return cls.from_arrays(arrays, meta)
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from app import bcrypt
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when every hashing thread is busy and the wait queue is full"""
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a small dedicated thread pool
+    bcrypt releases the GIL, so a login storm occupies at most PASSWORD_HASH_WORKERS
+    cores per process instead of every request thread; up to PASSWORD_HASH_MAX_QUEUE
+    more callers wait their turn and the rest are rejected with PasswordHasherBusy
+    """
+
+    def __init__(self):
+        self.max_workers = 2
+        self.max_queue = 32
+        self.log_rounds = 12
+        self._reset()
+
+        # Pool threads don't survive fork; start a fresh pool in the child on first use
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.tasks = 0
+        self.rejected = 0
+        self.rehash_failures = 0
+        self.queued = 0
+        self.running = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+        self.run_time_total = 0.0
+
+    def init_app(self, app):
+        """Configure the pool (PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE) and cost (BCRYPT_LOG_ROUNDS)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        self.max_workers = app.config.get('PASSWORD_HASH_WORKERS', 2)
+        self.max_queue = app.config.get('PASSWORD_HASH_MAX_QUEUE', 32)
+        self.log_rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self._reset()
+
+    def hash(self, password):
+        """bcrypt hash of password at BCRYPT_LOG_ROUNDS"""
+        return self._submit(bcrypt.generate_password_hash, password, self.log_rounds).decode('utf-8')
+
+    def verify(self, pw_hash, password):
+        """Check password against pw_hash"""
+        return self._submit(bcrypt.check_password_hash, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """Whether pw_hash was made with a cost other than BCRYPT_LOG_ROUNDS ($2b$<cost>$...)"""
+        try:
+            return int(pw_hash.split('$')[2]) != self.log_rounds
+        except (AttributeError, IndexError, ValueError):
+            return True
+
+    def record_rehash_failure(self):
+        """Count a failed upgrade of an existing hash to BCRYPT_LOG_ROUNDS (the login still succeeds)"""
+        with self._stats_lock:
+            self.rehash_failures += 1
+
+    def _submit(self, func, *args):
+        """Run func on the pool and wait for its result (inline with PASSWORD_HASH_WORKERS=0)"""
+        if self.max_workers <= 0:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Too many password checks in progress, please retry')
+
+        try:
+            with self._stats_lock:
+                self.queued += 1
+            return self._ensure_started().submit(self._run, time.perf_counter(), func, args).result()
+        finally:
+            self._slots.release()
+
+    def _ensure_started(self):
+        """Start the pool on first use (never at import, so forked workers each get their own)"""
+        if self._executor is not None:
+            return self._executor
+
+        with self._start_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='password-hasher')
+            return self._executor
+
+    def _run(self, submitted_at, func, args):
+        started_at = time.perf_counter()
+        queue_time = started_at - submitted_at
+        with self._stats_lock:
+            self.queued -= 1
+            self.running += 1
+            self.queue_time_total += queue_time
+            self.queue_time_max = max(self.queue_time_max, queue_time)
+
+        try:
+            return func(*args)
+        finally:
+            with self._stats_lock:
+                self.running -= 1
+                self.tasks += 1
+                self.run_time_total += time.perf_counter() - started_at
+
+    def stats(self):
+        """Pool metrics for this process (times in milliseconds)"""
+        with self._stats_lock:
+            return {
+                'workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'log_rounds': self.log_rounds,
+                'running': self.running,
+                'queued': self.queued,
+                'tasks': self.tasks,
+                'rejected': self.rejected,
+                'rehash_failures': self.rehash_failures,
+                'mean_queue_ms': round(self.queue_time_total / self.tasks * 1000, 2) if self.tasks else None,
+                'max_queue_ms': round(self.queue_time_max * 1000, 2),
+                'mean_run_ms': round(self.run_time_total / self.tasks * 1000, 2) if self.tasks else None
+            }
+
+# Global password hasher instance
+password_hasher = PasswordHasher()
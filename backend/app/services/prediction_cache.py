@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+
+class MemoryCacheBackend:
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """
+    Cache stored in a local SQLite file, shared by every worker process on the node
+    Values are stored as JSON; the oldest entries are evicted past max_size
+    """
+
+    def __init__(self, path, max_size, ttl):
+        self.path = path
+        self.max_size = max_size
+        self.ttl = ttl
+        self._local = threading.local()
+
+    def _connection(self):
+        # One connection per thread (and per process, since it is opened lazily after fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS prediction_cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS ix_prediction_cache_expires_at '
+                'ON prediction_cache (expires_at)'
+            )
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM prediction_cache WHERE key = ? AND expires_at >= ?',
+            (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO prediction_cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), time.time() + self.ttl)
+        )
+        conn.execute(
+            'DELETE FROM prediction_cache WHERE key IN ('
+            'SELECT key FROM prediction_cache ORDER BY expires_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_size,)
+        )
+
+    def clear(self):
+        self._connection().execute('DELETE FROM prediction_cache')
+
+    def size(self):
+        return self._connection().execute('SELECT COUNT(*) FROM prediction_cache').fetchone()[0]
+
+class PredictionCache:
+    """
+    Cache of full scoring results keyed by quantized model features and model version
+    Identical measurements always score identically, so resubmissions skip inference,
+    risk scoring and recommendation generation
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.quantum = 0.01
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Create the configured backend (PREDICTION_CACHE_BACKEND: memory, sqlite or none)"""
+        backend = app.config.get('PREDICTION_CACHE_BACKEND', 'memory')
+        max_size = app.config.get('PREDICTION_CACHE_MAX_SIZE', 10000)
+        ttl = app.config.get('PREDICTION_CACHE_TTL', 3600)
+        self.quantum = app.config.get('PREDICTION_CACHE_QUANTUM', 0.01)
+
+        if backend == 'memory':
+            self.backend = MemoryCacheBackend(max_size, ttl)
+        elif backend == 'sqlite':
+            path = app.config.get('PREDICTION_CACHE_PATH') or \
+                os.path.join(app.instance_path, 'prediction_cache.db')
+            self.backend = SQLiteCacheBackend(path, max_size, ttl)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Invalid PREDICTION_CACHE_BACKEND: {backend}")
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def make_key(self, feature_row, model_version):
+        """Quantize each feature to PREDICTION_CACHE_QUANTUM and prefix the model version"""
+        quantized = ','.join(str(round(value / self.quantum)) for value in feature_row)
+        return f'{model_version}|{quantized}'
+
+    def get(self, key):
+        """Return the cached result or None, counting hits and misses"""
+        if not self.enabled:
+            return None
+
+        value = self.backend.get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if self.enabled:
+            self.backend.set(key, value)
+
+    def clear(self):
+        """Drop every cached result (called when models reload)"""
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'backend': type(self.backend).__name__ if self.enabled else None,
+            'size': self.backend.size() if self.enabled else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
+
+# Global prediction cache instance
+prediction_cache = PredictionCache()
@@ -0,0 +1,107 @@
+import numpy as np
+from app.models.prediction import Prediction
+from app.services.ml_service import ml_service
+from app.services.prediction_cache import prediction_cache
+from app.services.risk_scorer import risk_scorer
+from app.services.recommendation_engine import recommendation_engine
+from app.services.metrics import PREDICTION_STAGE_DURATION
+
+class PredictionPipeline:
+    """Runs ML inference, risk scoring and recommendations for health records"""
+
+    @staticmethod
+    def score_records(health_records, users):
+        """
+        Score many health records with one vectorized ML pass
+        users is aligned with health_records (one user per record)
+        Cached results are reused; only cache misses reach the models
+        Returns one scoring result per record, in input order
+        """
+        ml_service.load_models()
+
+        with PREDICTION_STAGE_DURATION.time('feature_prep'):
+            feature_rows = [
+                ml_service.feature_row(health_record, user)
+                for health_record, user in zip(health_records, users)
+            ]
+
+        if not prediction_cache.enabled:
+            with PREDICTION_STAGE_DURATION.time('inference'):
+                ml_results = ml_service.predict_rows(feature_rows)
+            return PredictionPipeline._score_batch(health_records, ml_results)
+
+        with PREDICTION_STAGE_DURATION.time('cache_lookup'):
+            keys = [prediction_cache.make_key(row, ml_service.model_version) for row in feature_rows]
+            results = [prediction_cache.get(key) for key in keys]
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            with PREDICTION_STAGE_DURATION.time('inference'):
+                ml_results = ml_service.predict_rows([feature_rows[i] for i in missing])
+            scored = PredictionPipeline._score_batch([health_records[i] for i in missing], ml_results)
+            for i, result in zip(missing, scored):
+                results[i] = result
+                prediction_cache.set(keys[i], result)
+
+        return results
+
+    @staticmethod
+    def _score_batch(health_records, ml_results):
+        """
+        Apply risk scoring and recommendations to ML results for many records at once
+        Results may be shared through the prediction cache and must not be mutated
+        """
+        diabetes_risk = np.array([result['diabetes']['risk'] for result in ml_results], dtype=np.float64)
+        heart_risk = np.array([result['heart_disease']['risk'] for result in ml_results], dtype=np.float64)
+        obesity_risk = np.array([result['obesity']['risk'] for result in ml_results], dtype=np.float64)
+        bmi = np.array([health_record.bmi for health_record in health_records], dtype=np.float64)
+
+        with PREDICTION_STAGE_DURATION.time('scoring'):
+            # Calculate overall risk scores
+            overall_risk_scores = risk_scorer.calculate_overall_risk_score_batch(
+                diabetes_risk, heart_risk, obesity_risk, bmi
+            )
+
+            # Classify risk
+            risk_categories = risk_scorer.classify_risk_batch(overall_risk_scores)
+
+        # Generate recommendations
+        with PREDICTION_STAGE_DURATION.time('recommendations'):
+            recommendations = recommendation_engine.generate_recommendations_batch(
+                diabetes_risk, heart_risk, obesity_risk, bmi, risk_categories
+            )
+
+        return [
+            {
+                'ml_results': ml_result,
+                'overall_risk_score': overall_risk_score,
+                'risk_category': risk_category,
+                'recommendations': record_recommendations
+            }
+            for ml_result, overall_risk_score, risk_category, record_recommendations in zip(
+                ml_results, overall_risk_scores, risk_categories, recommendations
+            )
+        ]
+
+    @staticmethod
+    def build_prediction(user_id, health_record, result):
+        """Create (unsaved) Prediction row from a scoring result"""
+        ml_results = result['ml_results']
+
+        prediction = Prediction(
+            user_id=user_id,
+            health_record_id=health_record.id,
+            diabetes_risk=ml_results['diabetes']['risk'],
+            heart_disease_risk=ml_results['heart_disease']['risk'],
+            obesity_risk=ml_results['obesity']['risk'],
+            overall_risk_score=result['overall_risk_score'],
+            risk_category=result['risk_category']
+        )
+
+        prediction.set_recommendations(result['recommendations'])
+        prediction.set_models_used(ml_results['models_used'])
+
+        return prediction
+
+# Global prediction pipeline instance
+prediction_pipeline = PredictionPipeline()
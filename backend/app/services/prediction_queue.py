@@ -0,0 +1,162 @@
+import logging
+import uuid
+from datetime import datetime, timedelta
+from app import db
+from app.models.user import User
+from app.models.health_record import HealthRecord
+from app.models.prediction_job import PredictionJob
+from app.models.user_health_summary import UserHealthSummary
+from app.services.prediction_pipeline import prediction_pipeline
+
+logger = logging.getLogger(__name__)
+
+class PredictionQueue:
+    """
+    Database-backed prediction job queue
+    The API enqueues jobs; worker processes claim them in micro-batches and
+    score each batch with one prediction pipeline pass
+    """
+
+    @staticmethod
+    def enqueue(user_id, health_record_id):
+        """Add a pending job (caller commits)"""
+        job = PredictionJob(user_id=user_id, health_record_id=health_record_id, status=PredictionJob.PENDING)
+        db.session.add(job)
+        return job
+
+    @staticmethod
+    def claim(batch_size):
+        """
+        Atomically mark up to batch_size of the oldest pending jobs as running for this worker
+        The status check in the UPDATE means concurrent workers never claim the same job
+        Returns the claimed jobs, oldest first
+        """
+        token = uuid.uuid4().hex
+        pending_ids = db.session.query(PredictionJob.id).filter(
+            PredictionJob.status == PredictionJob.PENDING
+        ).order_by(PredictionJob.id).limit(batch_size).scalar_subquery()
+
+        PredictionJob.query.filter(
+            PredictionJob.id.in_(pending_ids),
+            PredictionJob.status == PredictionJob.PENDING
+        ).update({
+            'status': PredictionJob.RUNNING,
+            'claim_token': token,
+            'started_at': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+
+        return PredictionJob.query.filter_by(claim_token=token).order_by(PredictionJob.id).all()
+
+    @staticmethod
+    def process(jobs):
+        """
+        Score claimed jobs in one batch, save their predictions and mark them finished
+        Jobs that requeue_stale took back while the batch ran belong to another claim
+        by then, so their results are discarded
+        """
+        if not jobs:
+            return 0
+
+        # Read before any rollback, which would reload a requeued job's new token
+        claims = {job.id: job.claim_token for job in jobs}
+
+        try:
+            records = {
+                record.id: record
+                for record in HealthRecord.query.filter(
+                    HealthRecord.id.in_({job.health_record_id for job in jobs})
+                ).all()
+            }
+            users = {
+                user.id: user
+                for user in User.query.filter(User.id.in_({job.user_id for job in jobs})).all()
+            }
+
+            runnable = []
+            for job in jobs:
+                record = records.get(job.health_record_id)
+                if record is None or record.user_id != job.user_id:
+                    PredictionQueue._finish(
+                        job.id, claims[job.id], PredictionJob.FAILED, error='Health record not found'
+                    )
+                else:
+                    runnable.append(job)
+
+            completed = 0
+            if runnable:
+                results = prediction_pipeline.score_records(
+                    [records[job.health_record_id] for job in runnable],
+                    [users[job.user_id] for job in runnable]
+                )
+
+                # Mark jobs completed first; the rows stay locked until commit, so a
+                # requeue can no longer take them and lost jobs are skipped here
+                owned = [
+                    (job, result) for job, result in zip(runnable, results)
+                    if PredictionQueue._finish(job.id, claims[job.id], PredictionJob.COMPLETED)
+                ]
+                predictions = [
+                    prediction_pipeline.build_prediction(job.user_id, records[job.health_record_id], result)
+                    for job, result in owned
+                ]
+
+                db.session.add_all(predictions)
+                db.session.flush()
+
+                # Jobs are oldest first, so each user's latest prediction comes last
+                by_user = {}
+                for (job, _), prediction in zip(owned, predictions):
+                    by_user.setdefault(job.user_id, []).append(prediction)
+                    PredictionQueue._finish(
+                        job.id, claims[job.id], PredictionJob.COMPLETED, prediction_id=prediction.id
+                    )
+                for user_id, user_predictions in by_user.items():
+                    UserHealthSummary.add_predictions(user_id, user_predictions)
+                completed = len(owned)
+
+            db.session.commit()
+            return completed
+
+        except Exception as e:
+            db.session.rollback()
+            logger.exception("Prediction batch of %d jobs failed", len(jobs))
+            for job_id, claim_token in claims.items():
+                PredictionQueue._finish(job_id, claim_token, PredictionJob.FAILED, error=str(e))
+            db.session.commit()
+            return 0
+
+    @staticmethod
+    def requeue_stale(timeout):
+        """Return jobs left running longer than timeout seconds (e.g. by a killed worker) to pending"""
+        count = PredictionJob.query.filter(
+            PredictionJob.status == PredictionJob.RUNNING,
+            PredictionJob.started_at < datetime.utcnow() - timedelta(seconds=timeout)
+        ).update({
+            'status': PredictionJob.PENDING,
+            'claim_token': None,
+            'started_at': None
+        }, synchronize_session=False)
+        db.session.commit()
+        return count
+
+    @staticmethod
+    def _finish(job_id, claim_token, status, prediction_id=None, error=None):
+        """
+        Record a job's outcome if it is still held by claim_token (caller commits)
+        Returns False when the job was requeued (and possibly claimed again) since
+        """
+        if claim_token is None:
+            return False
+        return PredictionJob.query.filter(
+            PredictionJob.id == job_id,
+            PredictionJob.claim_token == claim_token
+        ).update({
+            'status': status,
+            'prediction_id': prediction_id,
+            'error': error,
+            'finished_at': datetime.utcnow()
+        }, synchronize_session=False) == 1
+
+# Global prediction queue instance
+prediction_queue = PredictionQueue()
@@ -1,3 +1,41 @@
+import json
+import itertools
+from bisect import bisect_left
+import numpy as np
+from app.utils.json_provider import EncodedDict
+
+# Thresholds the recommendation rules compare each input against (always with >)
+# A value's bucket is the number of thresholds it exceeds, so all values in a bucket get the same recommendations
+DIABETES_THRESHOLDS = (0.3, 0.5, 0.6, 0.7)
+HEART_THRESHOLDS = (0.3, 0.5, 0.6, 0.7)
+OBESITY_THRESHOLDS = (0.6, 0.7)
+BMI_THRESHOLDS = (25, 30)
+RISK_CATEGORIES = ('Low', 'Medium', 'High')
+
+class RecommendationSet(EncodedDict):
+    """
+    Recommendations dict from the lookup table, with its JSON encodings precomputed
+    (content is the stored form, json the response fragment)
+    Shared by every prediction in the same buckets, so it must not be mutated
+    """
+
+    def __init__(self, recommendations, content):
+        super().__init__(recommendations)
+        self.content = content
+
+def _bucket(value, thresholds):
+    """Number of thresholds value exceeds (0 for NaN, which exceeds none)"""
+    return bisect_left(thresholds, value)
+
+def _bucket_batch(values, thresholds):
+    """Array version of _bucket"""
+    values = np.asarray(values, dtype=np.float64)
+    return (values[:, np.newaxis] > np.array(thresholds)).sum(axis=1)
+
+def _representative(bucket, thresholds):
+    """A value that falls in bucket"""
+    return thresholds[bucket] if bucket < len(thresholds) else thresholds[-1] + 1
+
 class RecommendationEngine:
     """Rule-based health recommendation system"""
     
@@ -5,6 +43,75 @@ class RecommendationEngine:
     def generate_recommendations(diabetes_risk, heart_risk, obesity_risk, bmi, risk_category):
         """
         Generate personalized health recommendations
+        Returns structured recommendations by category, looked up from the precomputed table
+        """
+        key = (
+            _bucket(diabetes_risk, DIABETES_THRESHOLDS),
+            _bucket(heart_risk, HEART_THRESHOLDS),
+            _bucket(obesity_risk, OBESITY_THRESHOLDS),
+            _bucket(bmi, BMI_THRESHOLDS),
+            risk_category
+        )
+        recommendations = RECOMMENDATION_TABLE.get(key)
+        if recommendations is None:
+            return RecommendationEngine.evaluate_rules(diabetes_risk, heart_risk, obesity_risk, bmi, risk_category)
+        return recommendations
+    
+    @staticmethod
+    def generate_recommendations_batch(diabetes_risk, heart_risk, obesity_risk, bmi, risk_category):
+        """
+        Array version of generate_recommendations for N records
+        Returns one recommendations dict per record, identical to the scalar path
+        """
+        keys = zip(
+            _bucket_batch(diabetes_risk, DIABETES_THRESHOLDS).tolist(),
+            _bucket_batch(heart_risk, HEART_THRESHOLDS).tolist(),
+            _bucket_batch(obesity_risk, OBESITY_THRESHOLDS).tolist(),
+            _bucket_batch(bmi, BMI_THRESHOLDS).tolist(),
+            risk_category
+        )
+        return [
+            RECOMMENDATION_TABLE.get(key) or RecommendationEngine.evaluate_rules(
+                diabetes_risk[i], heart_risk[i], obesity_risk[i], bmi[i], risk_category[i]
+            )
+            for i, key in enumerate(keys)
+        ]
+    
+    @staticmethod
+    def compile_table():
+        """
+        Evaluate the rules once per bucket combination
+        Returns {(diabetes, heart, obesity, bmi bucket, risk category): RecommendationSet};
+        combinations with identical recommendations share one RecommendationSet
+        """
+        table = {}
+        sets = {}
+        
+        for diabetes, heart, obesity, bmi, risk_category in itertools.product(
+            range(len(DIABETES_THRESHOLDS) + 1),
+            range(len(HEART_THRESHOLDS) + 1),
+            range(len(OBESITY_THRESHOLDS) + 1),
+            range(len(BMI_THRESHOLDS) + 1),
+            RISK_CATEGORIES
+        ):
+            recommendations = RecommendationEngine.evaluate_rules(
+                _representative(diabetes, DIABETES_THRESHOLDS),
+                _representative(heart, HEART_THRESHOLDS),
+                _representative(obesity, OBESITY_THRESHOLDS),
+                _representative(bmi, BMI_THRESHOLDS),
+                risk_category
+            )
+            encoded = json.dumps(recommendations)
+            if encoded not in sets:
+                sets[encoded] = RecommendationSet(recommendations, encoded)
+            table[(diabetes, heart, obesity, bmi, risk_category)] = sets[encoded]
+        
+        return table
+    
+    @staticmethod
+    def evaluate_rules(diabetes_risk, heart_risk, obesity_risk, bmi, risk_category):
+        """
+        Apply the recommendation rules directly
         Returns structured recommendations by category
         """
         recommendations = {
@@ -156,5 +263,8 @@ class RecommendationEngine:
         
         return recommendations
 
+# Recommendations for every bucket combination, compiled at import
+RECOMMENDATION_TABLE = RecommendationEngine.compile_table()
+
 # Global recommendation engine instance
 recommendation_engine = RecommendationEngine()
@@ -1,3 +1,9 @@
+import numpy as np
+
+# classify_risk boundaries and categories, for np.digitize
+RISK_THRESHOLDS = [30, 60]
+RISK_CATEGORIES = np.array(['Low', 'Medium', 'High'])
+
 class RiskScorer:
     """Health risk scoring and classification service"""
     
@@ -45,6 +51,31 @@ class RiskScorer:
             # Obese
             return 0.8
     
+    @staticmethod
+    def calculate_overall_risk_score_batch(diabetes_risk, heart_risk, obesity_risk, bmi):
+        """
+        Array version of calculate_overall_risk_score for N records
+        Returns a list of scores identical to the scalar path
+        """
+        bmi_risk = RiskScorer._calculate_bmi_risk_batch(bmi)
+        
+        # Same weights and operation order as the scalar path
+        overall_risk = (
+            np.asarray(diabetes_risk, dtype=np.float64) * 0.3 +
+            np.asarray(heart_risk, dtype=np.float64) * 0.35 +
+            np.asarray(obesity_risk, dtype=np.float64) * 0.25 +
+            bmi_risk * 0.1
+        )
+        
+        # Python round (exact decimal rounding), not np.round, to match the scalar path
+        return [round(value, 2) for value in (overall_risk * 100).tolist()]
+    
+    @staticmethod
+    def _calculate_bmi_risk_batch(bmi):
+        """Array version of _calculate_bmi_risk"""
+        bmi = np.asarray(bmi, dtype=np.float64)
+        return np.select([bmi < 18.5, bmi < 25, bmi < 30], [0.3, 0.1, 0.5], default=0.8)
+    
     @staticmethod
     def classify_risk(risk_score):
         """
@@ -58,6 +89,11 @@ class RiskScorer:
         else:
             return 'High'
     
+    @staticmethod
+    def classify_risk_batch(risk_scores):
+        """Array version of classify_risk; returns a list of categories"""
+        return RISK_CATEGORIES[np.digitize(np.asarray(risk_scores, dtype=np.float64), RISK_THRESHOLDS)].tolist()
+    
     @staticmethod
     def generate_risk_explanation(risk_category, diabetes_risk, heart_risk, obesity_risk, bmi):
         """Generate human-readable risk explanation"""
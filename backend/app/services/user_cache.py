@@ -0,0 +1,126 @@
+import threading
+from collections import namedtuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.services.prediction_cache import MemoryCacheBackend
+
+# Existing user with the age from its JWT claims (USER_JWT_CLAIMS): just what prediction and health routes read
+TokenUser = namedtuple('TokenUser', ['id', 'age'])
+
+class UserCache:
+    """
+    Per-process cache of users (User.row_query rows, no password hash) keyed by id
+    Saves authenticated routes the lookup that only confirms the user exists or reads its age.
+    Entries are dropped when a user is updated or deleted in this process; other processes
+    see the change after USER_CACHE_TTL seconds
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.jwt_claims = False
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Create the cache (USER_CACHE_ENABLED, USER_CACHE_MAX_SIZE, USER_CACHE_TTL)"""
+        if app.config.get('USER_CACHE_ENABLED', True):
+            self.backend = MemoryCacheBackend(
+                app.config.get('USER_CACHE_MAX_SIZE', 10000),
+                app.config.get('USER_CACHE_TTL', 60)
+            )
+        else:
+            self.backend = None
+        self.jwt_claims = app.config.get('USER_JWT_CLAIMS', False)
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get(self, user_id):
+        """User row for user_id (a JWT identity), or None if there is no such user"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        if not self.enabled:
+            return User.row_query().filter(User.id == user_id).first()
+
+        user = self.backend.get(user_id)
+        with self._lock:
+            if user is not None:
+                self.hits += 1
+                return user
+            self.misses += 1
+            generation = self._generation
+
+        user = User.row_query().filter(User.id == user_id).first()
+        with self._lock:
+            # Skip caching if a user changed while the row was loading (it may be stale)
+            if user is not None and generation == self._generation:
+                self.backend.set(user_id, user)
+        return user
+
+    def invalidate(self, user_ids):
+        """Drop cached users (called after commits that update or delete them)"""
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._generation += 1
+            for user_id in user_ids:
+                self.backend.delete(user_id)
+
+    def clear(self):
+        if self.enabled:
+            with self._lock:
+                self._generation += 1
+                self.backend.clear()
+
+    def token_claims(self, user):
+        """Additional JWT claims for user's access token (empty unless USER_JWT_CLAIMS)"""
+        return {'age': user.age} if self.jwt_claims else {}
+
+    def with_claims(self, user, claims):
+        """
+        user with the age from its token's claims, so it matches the token's other data
+        user must come from get: the claims alone don't prove the user still exists
+        """
+        if not self.jwt_claims or 'age' not in claims:
+            return user
+        return TokenUser(user.id, claims['age'])
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'jwt_claims': self.jwt_claims,
+            'size': self.backend.size() if self.enabled else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None
+        }
+
+# Global user cache instance
+user_cache = UserCache()
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _track_changed_user(mapper, connection, target):
+    """Remember users changed in this transaction; they are invalidated once it commits"""
+    Session.object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    changed = session.info.pop('changed_user_ids', None)
+    if changed:
+        user_cache.invalidate(changed)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changed_users(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('changed_user_ids', None)
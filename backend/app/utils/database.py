@@ -0,0 +1,59 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+from app.services.db_metrics import db_metrics
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    # Log with SQLAlchemy's pool loggers, not under the Flask app's logger
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.TimedQueuePool'
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_metrics.record_pool_wait(time.perf_counter() - start)
+
+def engine_options(config):
+    """
+    SQLALCHEMY_ENGINE_OPTIONS built from the DB_POOL_* settings
+    In-memory SQLite keeps Flask-SQLAlchemy's single shared connection; file SQLite
+    skips pre-ping and recycling, since there is no server to drop connections
+    """
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'):
+        return {}
+
+    options = {
+        'poolclass': TimedQueuePool,
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT']
+    }
+    if not url.drivername.startswith('sqlite'):
+        options['pool_pre_ping'] = config['DB_POOL_PRE_PING']
+        options['pool_recycle'] = config['DB_POOL_RECYCLE']
+    return options
+
+def apply_sqlite_pragmas(engine, config):
+    """Set the SQLITE_* pragmas on every new connection to a SQLite engine"""
+    if not engine.url.drivername.startswith('sqlite'):
+        return
+
+    pragmas = [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT')),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE'))
+    ]
+    statements = [f'PRAGMA {name}={value}' for name, value in pragmas if value not in (None, '')]
+
+    @event.listens_for(engine, 'connect')
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for statement in statements:
+            cursor.execute(statement)
+        cursor.close()
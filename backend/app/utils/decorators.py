@@ -1,7 +1,7 @@
 from functools import wraps
 from flask import jsonify
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from app.models.user import User
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
+from app.services.user_cache import user_cache
 
 def token_required(f):
     """Decorator to protect routes with JWT authentication"""
@@ -15,10 +15,12 @@ def token_required(f):
     return decorated_function
 
 def get_current_user():
-    """Get current authenticated user from JWT token"""
-    try:
-        user_id = get_jwt_identity()
-        user = User.query.get(user_id)
-        return user
-    except Exception:
+    """
+    Get current authenticated user from JWT token
+    Returns a read-only user (a cached User.row_query row; with USER_JWT_CLAIMS, its id
+    with the age from the token's claims), or None if the user does not exist
+    """
+    user = user_cache.get(get_jwt_identity())
+    if user is None:
         return None
+    return user_cache.with_claims(user, get_jwt())
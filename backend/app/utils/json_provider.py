@@ -0,0 +1,98 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib provider
+    orjson = None
+
+# JSON providers:
+#   auto   - orjson when installed, otherwise stdlib
+#   orjson - orjson (raw passthrough of pre-encoded values with orjson >= 3.9)
+#   stdlib - Flask's default json module provider
+JSON_PROVIDERS = ('auto', 'orjson', 'stdlib')
+
+class EncodedDict(dict):
+    """
+    dict that carries its own JSON encoding, e.g. a value stored as JSON in the database
+    Providers that support it write the encoding straight into the response instead of
+    serializing the dict again. Shared between callers, so it must not be mutated
+    """
+
+    def __init__(self, data):
+        super().__init__(data)
+        # Encoded the way both providers encode responses: sorted keys, compact
+        self.json = json.dumps(self, separators=(',', ':'), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, encoded):
+        """EncodedDict for stored JSON (re-encoded, since the stored spacing and key order may differ)"""
+        return cls(json.loads(encoded))
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    DefaultJSONProvider with orjson doing the encoding
+    Keeps the default provider's behavior: sorted keys, compact output (indented in debug),
+    HTTP dates for datetimes and the same fallbacks for other types
+    """
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.fragments = hasattr(orjson, 'Fragment')
+
+    def _default(self, obj):
+        """Encode subclasses and types orjson leaves to the caller"""
+        if isinstance(obj, dict):
+            encoded = getattr(obj, 'json', None)
+            if isinstance(encoded, str):
+                return orjson.Fragment(encoded)
+            return dict(obj)
+        if isinstance(obj, str):
+            return str(obj)
+        if isinstance(obj, int):
+            return int(obj)
+        if isinstance(obj, float):
+            return float(obj)
+        if isinstance(obj, list):
+            return list(obj)
+        return DefaultJSONProvider.default(obj)
+
+    def _dumps(self, obj, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.fragments:
+            # Route EncodedDict (and other subclasses) through _default
+            option |= orjson.OPT_PASSTHROUGH_SUBCLASS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self._default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        """Serialize data as JSON; json.dumps keyword arguments use the stdlib encoder"""
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps(obj, indent) + b'\n', mimetype=self.mimetype)
+
+def make_json_provider(app):
+    """Build the JSON provider selected by JSON_PROVIDER"""
+    provider = app.config.get('JSON_PROVIDER', 'auto')
+    if provider not in JSON_PROVIDERS:
+        raise ValueError(f"Invalid JSON_PROVIDER: {provider}")
+
+    if provider == 'orjson' and orjson is None:
+        raise ValueError("JSON_PROVIDER=orjson requires the orjson package")
+
+    if provider == 'stdlib' or orjson is None:
+        return DefaultJSONProvider(app)
+    return OrjsonProvider(app)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+def parse_cursor(cursor):
+    """
+    Parse a '<created_at>,<id>' cursor
+    Returns (created_at, id), or None for an empty cursor (first page)
+    Raises ValueError if malformed
+    """
+    if not cursor:
+        return None
+    created_at, _, record_id = cursor.rpartition(',')
+    return datetime.fromisoformat(created_at), int(record_id)
+
+def encode_cursor(row):
+    """Cursor pointing just after row"""
+    return f'{row.created_at.isoformat()},{row.id}'
+
+def keyset_page(query, model, cursor, limit):
+    """
+    Fetch one newest-first page after cursor using (created_at, id) keyset pagination
+    No OFFSET and no COUNT: cost stays flat however deep the page is
+    Returns (rows, next_cursor); next_cursor is None on the last page
+    """
+    position = parse_cursor(cursor)
+    if position is not None:
+        created_at, last_id = position
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < last_id)
+        ))
+
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+def validate_limit(limit):
+    """Validate cursor page size"""
+    if limit is None:
+        return True, DEFAULT_LIMIT
+    if limit < 1 or limit > MAX_LIMIT:
+        return False, f"limit must be between 1 and {MAX_LIMIT}"
+    return True, limit
@@ -1,4 +1,5 @@
 import re
+import numpy as np
 
 def validate_email(email):
     """Validate email format"""
@@ -58,3 +59,68 @@ def validate_gender(gender):
     if gender.lower() not in valid_genders:
         return False, f"Gender must be one of: {', '.join(valid_genders)}"
     return True, "Valid gender"
+
+
+HEALTH_RECORD_FIELDS = ['height', 'weight', 'blood_pressure_systolic', 'blood_pressure_diastolic', 'blood_sugar']
+
+def _numeric_column(rows, field, integer=False):
+    """
+    Column of field values as float64 plus a mask of rows holding a number of the right type
+    (int for integer fields, int or float otherwise, as the single-record validators require)
+    """
+    values = [row.get(field) for row in rows]
+    allowed = int if integer else (int, float)
+    typed = np.array([isinstance(value, allowed) for value in values], dtype=bool)
+    column = np.array([value if ok else np.nan for value, ok in zip(values, typed)], dtype=np.float64)
+    return column, typed & np.isfinite(column)
+
+def validate_health_records_batch(rows):
+    """
+    Validate many health records at once with the same rules as the single-record validators
+    Returns (columns, errors): columns maps each required field to a NumPy array,
+    errors maps row index to the first failing rule's message
+    """
+    n = len(rows)
+    is_object = np.array([isinstance(row, dict) for row in rows], dtype=bool)
+    rows = [row if isinstance(row, dict) else {} for row in rows]
+    
+    present = np.array([all(k in row for k in HEALTH_RECORD_FIELDS) for row in rows], dtype=bool)
+    
+    height, height_ok = _numeric_column(rows, 'height')
+    weight, weight_ok = _numeric_column(rows, 'weight')
+    systolic, systolic_ok = _numeric_column(rows, 'blood_pressure_systolic', integer=True)
+    diastolic, diastolic_ok = _numeric_column(rows, 'blood_pressure_diastolic', integer=True)
+    blood_sugar, blood_sugar_ok = _numeric_column(rows, 'blood_sugar')
+    
+    lifestyle_ok = np.array([
+        isinstance(row.get('lifestyle_habits'), (str, type(None))) for row in rows
+    ], dtype=bool)
+    
+    # Checks in the order the single-record endpoint applies them; the first failure wins
+    checks = [
+        (~is_object, "Each record must be an object"),
+        (~present, f'Missing required fields: {", ".join(HEALTH_RECORD_FIELDS)}'),
+        (~height_ok | (height < 50) | (height > 250), "Height must be between 50 and 250 cm"),
+        (~weight_ok | (weight < 20) | (weight > 300), "Weight must be between 20 and 300 kg"),
+        (~systolic_ok | (systolic < 70) | (systolic > 200), "Systolic BP must be between 70 and 200 mmHg"),
+        (~diastolic_ok | (diastolic < 40) | (diastolic > 130), "Diastolic BP must be between 40 and 130 mmHg"),
+        (systolic <= diastolic, "Systolic BP must be greater than diastolic BP"),
+        (~blood_sugar_ok | (blood_sugar < 40) | (blood_sugar > 400), "Blood sugar must be between 40 and 400 mg/dL"),
+        (~lifestyle_ok, "Lifestyle habits must be a string"),
+    ]
+    
+    failed = np.vstack([mask for mask, _ in checks]) if n else np.zeros((len(checks), 0), dtype=bool)
+    first_failure = failed.argmax(axis=0)
+    errors = {
+        int(i): checks[first_failure[i]][1]
+        for i in np.flatnonzero(failed.any(axis=0))
+    }
+    
+    columns = {
+        'height': height,
+        'weight': weight,
+        'blood_pressure_systolic': systolic,
+        'blood_pressure_diastolic': diastolic,
+        'blood_sugar': blood_sugar
+    }
+    return columns, errors
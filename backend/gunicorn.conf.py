@@ -0,0 +1,31 @@
+"""
+Gunicorn configuration
+Picked up automatically when gunicorn is started from the backend directory.
+
+With preload_app the app (and its ML models) is created once in the
+master process; forked workers then share the model memory copy-on-write
+instead of each unpickling their own copy.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 1))
+preload_app = os.environ.get('GUNICORN_PRELOAD_APP', 'True').lower() == 'true'
+
+def when_ready(server):
+    """Move preloaded objects out of the collector so GC passes don't touch (and copy) their pages"""
+    if preload_app:
+        gc.freeze()
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process"""
+    if not preload_app:
+        return
+
+    from app import db
+
+    app = server.app.wsgi()
+    with app.app_context():
+        db.engine.dispose(close=False)
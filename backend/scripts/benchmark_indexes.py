@@ -0,0 +1,145 @@
+"""
+Benchmark the per-user access patterns with and without the model indexes
+Fills a scratch database with synthetic health records and predictions,
+then prints query plans and timings before and after creating the indexes.
+Usage: python benchmark_indexes.py [--rows 1000000] [--users 1000] [--database-url URL]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import create_engine, text
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import db
+from app.models import User, HealthRecord, Prediction
+
+QUERIES = {
+    'health records page': (
+        'SELECT * FROM health_records WHERE user_id = :user_id '
+        'ORDER BY created_at DESC LIMIT 10'
+    ),
+    'health records count': 'SELECT COUNT(*) FROM health_records WHERE user_id = :user_id',
+    'predictions page': (
+        'SELECT * FROM predictions WHERE user_id = :user_id '
+        'ORDER BY created_at DESC LIMIT 10'
+    ),
+    'predictions for record': 'SELECT id FROM predictions WHERE health_record_id = :health_record_id',
+}
+
+BENCHMARKED_INDEXES = [
+    index
+    for table in (HealthRecord.__table__, Prediction.__table__)
+    for index in table.indexes
+]
+
+def populate(engine, n_rows, n_users, chunk_size=50000):
+    """Insert n_rows health records (one prediction each) spread over n_users"""
+    rng = np.random.RandomState(42)
+    start = datetime(2020, 1, 1)
+
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {'id': i, 'email': f'user{i}@example.com', 'password_hash': 'x', 'name': f'User {i}'}
+            for i in range(1, n_users + 1)
+        ])
+
+    for offset in range(0, n_rows, chunk_size):
+        size = min(chunk_size, n_rows - offset)
+        ids = np.arange(offset + 1, offset + size + 1)
+        user_ids = rng.randint(1, n_users + 1, size)
+        created = [start + timedelta(minutes=int(m)) for m in rng.randint(0, 60 * 24 * 365 * 5, size)]
+        risks = rng.uniform(0, 1, (size, 3))
+
+        with engine.begin() as conn:
+            conn.execute(HealthRecord.__table__.insert(), [
+                {
+                    'id': int(ids[i]), 'user_id': int(user_ids[i]), 'height': 170.0, 'weight': 70.0,
+                    'bmi': 24.2, 'blood_pressure_systolic': 120, 'blood_pressure_diastolic': 80,
+                    'blood_sugar': 100.0, 'created_at': created[i]
+                }
+                for i in range(size)
+            ])
+            conn.execute(Prediction.__table__.insert(), [
+                {
+                    'id': int(ids[i]), 'user_id': int(user_ids[i]), 'health_record_id': int(ids[i]),
+                    'diabetes_risk': float(risks[i, 0]), 'heart_disease_risk': float(risks[i, 1]),
+                    'obesity_risk': float(risks[i, 2]), 'overall_risk_score': float(risks[i].mean() * 100),
+                    'risk_category': 'Medium', 'created_at': created[i]
+                }
+                for i in range(size)
+            ])
+
+        print(f"  inserted {offset + size:,}/{n_rows:,} rows", end='\r')
+    print()
+
+def explain(conn, sql, params):
+    """Query plan as text for SQLite or PostgreSQL"""
+    if conn.dialect.name == 'sqlite':
+        rows = conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).fetchall()
+        return '; '.join(row[-1] for row in rows)
+    rows = conn.execute(text(f'EXPLAIN {sql}'), params).fetchall()
+    return '; '.join(row[0].strip() for row in rows)
+
+def run_queries(engine, n_users, n_rows, repeat=50):
+    """Print plan and mean latency for each access pattern"""
+    rng = np.random.RandomState(7)
+
+    with engine.connect() as conn:
+        for name, sql in QUERIES.items():
+            params_list = [
+                {'user_id': int(rng.randint(1, n_users + 1)), 'health_record_id': int(rng.randint(1, n_rows + 1))}
+                for _ in range(repeat)
+            ]
+            bound = [{k: v for k, v in params.items() if f':{k}' in sql} for params in params_list]
+
+            plan = explain(conn, sql, bound[0])
+            start = time.perf_counter()
+            for params in bound:
+                conn.execute(text(sql), params).fetchall()
+            elapsed = (time.perf_counter() - start) / repeat
+
+            print(f"  {name:<24} {elapsed * 1000:8.2f} ms   {plan}")
+
+def benchmark(database_url, n_rows, n_users):
+    engine = create_engine(database_url)
+
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for index in BENCHMARKED_INDEXES:
+            index.drop(bind=conn)
+
+    print(f"Populating {n_rows:,} rows for {n_users:,} users...")
+    populate(engine, n_rows, n_users)
+
+    print("\nWithout indexes:")
+    run_queries(engine, n_users, n_rows)
+
+    print("\nCreating indexes...")
+    with engine.begin() as conn:
+        for index in BENCHMARKED_INDEXES:
+            start = time.perf_counter()
+            index.create(bind=conn)
+            print(f"  ✓ {index.name} ({time.perf_counter() - start:.1f}s)")
+        conn.execute(text('ANALYZE'))
+
+    print("\nWith indexes:")
+    run_queries(engine, n_users, n_rows)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark per-user query plans with and without indexes')
+    parser.add_argument('--rows', type=int, default=1000000, help='health records (and predictions) to insert')
+    parser.add_argument('--users', type=int, default=1000, help='number of users to spread rows over')
+    parser.add_argument(
+        '--database-url',
+        default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'health_insight_index_benchmark.db')}",
+        help='scratch database (all tables in it are dropped)'
+    )
+    args = parser.parse_args()
+    benchmark(args.database_url, args.rows, args.users)
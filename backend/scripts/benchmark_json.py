@@ -0,0 +1,116 @@
+"""
+Benchmark list endpoint throughput with each JSON provider
+Fills a scratch SQLite database with one user's health records and predictions,
+then times GET requests to the list endpoints through the Flask test client.
+Usage: python benchmark_json.py [--rows 5000] [--per-page 100] [--requests 200]
+"""
+import sys
+import os
+import time
+import argparse
+import tempfile
+
+# Scratch database and no model loading; must be set before the app config is imported
+DATABASE_PATH = os.path.join(tempfile.gettempdir(), 'health_insight_json_benchmark.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{DATABASE_PATH}'
+os.environ['ML_PRELOAD_MODELS'] = 'False'
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask.json.provider import DefaultJSONProvider
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, HealthRecord
+from app.services.prediction_pipeline import prediction_pipeline
+from app.services.recommendation_engine import recommendation_engine
+from app.utils.json_provider import OrjsonProvider, orjson
+
+ENDPOINTS = [
+    '/api/health/records?per_page={per_page}',
+    '/api/predictions?per_page={per_page}',
+    '/api/health/records?cursor=&limit={per_page}',
+    '/api/predictions?cursor=&limit={per_page}',
+    '/api/dashboard/timeline?limit={per_page}',
+]
+
+def populate(n_rows):
+    """One user with n_rows health records, each with a prediction"""
+    user = User(email='benchmark@example.com', name='Benchmark User', age=45, password_hash='x')
+    db.session.add(user)
+    db.session.flush()
+
+    for i in range(n_rows):
+        record = HealthRecord(
+            user_id=user.id, height=170.0, weight=60.0 + i % 40, bmi=round((60.0 + i % 40) / 2.89, 2),
+            blood_pressure_systolic=110 + i % 60, blood_pressure_diastolic=70 + i % 30, blood_sugar=80.0 + i % 150
+        )
+        db.session.add(record)
+        db.session.flush()
+
+        risks = [(i % 97) / 97, (i % 89) / 89, (i % 83) / 83]
+        result = {
+            'ml_results': {
+                'diabetes': {'risk': risks[0]},
+                'heart_disease': {'risk': risks[1]},
+                'obesity': {'risk': risks[2]},
+                'models_used': {'diabetes': 'rf', 'heart_disease': 'rf', 'obesity': 'rf'}
+            },
+            'overall_risk_score': round(sum(risks) * 30, 2),
+            'risk_category': 'Medium',
+            'recommendations': recommendation_engine.generate_recommendations(
+                risks[0], risks[1], risks[2], record.bmi, 'Medium'
+            )
+        }
+        db.session.add(prediction_pipeline.build_prediction(user.id, record, result))
+
+    db.session.commit()
+    return user.id
+
+def benchmark(n_rows, per_page, n_requests):
+    if os.path.exists(DATABASE_PATH):
+        os.remove(DATABASE_PATH)
+
+    app = create_app('production')
+    client = app.test_client()
+
+    with app.app_context():
+        print(f"Populating {n_rows:,} health records and predictions...")
+        user_id = populate(n_rows)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user_id))}'}
+
+    providers = [('stdlib', DefaultJSONProvider(app))]
+    if orjson is not None:
+        providers.append(('orjson', OrjsonProvider(app)))
+    else:
+        print("orjson not installed; only the stdlib provider is benchmarked")
+
+    print(f"\n{'endpoint':<48}" + ''.join(f"{name:>14}" for name, _ in providers))
+
+    for endpoint in ENDPOINTS:
+        url = endpoint.format(per_page=per_page)
+        throughputs = []
+
+        for name, provider in providers:
+            app.json = provider
+            client.get(url, headers=headers)  # warm up
+
+            start = time.perf_counter()
+            for _ in range(n_requests):
+                response = client.get(url, headers=headers)
+            elapsed = time.perf_counter() - start
+
+            assert response.status_code == 200, response.get_data(as_text=True)
+            throughputs.append(n_requests / elapsed)
+
+        print(f"{url:<48}" + ''.join(f"{rps:>10.0f} r/s" for rps in throughputs))
+
+    os.remove(DATABASE_PATH)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark list endpoint throughput per JSON provider')
+    parser.add_argument('--rows', type=int, default=5000, help='health records (and predictions) to insert')
+    parser.add_argument('--per-page', type=int, default=100, help='items per list request')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and provider')
+    args = parser.parse_args()
+    benchmark(args.rows, args.per_page, args.requests)
@@ -0,0 +1,104 @@
+"""
+Script to check the native scoring engine against scikit-learn
+Every trained model is scored by both backends on random inputs and on
+inputs placed exactly on tree split thresholds; outputs must be identical.
+Also reports single-row latency for each backend.
+"""
+
+import sys
+import os
+import time
+import numpy as np
+import joblib
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.native_scoring import compile_model
+
+MODELS_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app', 'ml_models')
+CONDITIONS = ['diabetes', 'heart', 'obesity']
+ALGORITHMS = ['lr', 'dt', 'rf']
+
+def generate_inputs(n_samples=5000):
+    """Random raw feature rows covering the validated input ranges"""
+    rng = np.random.RandomState(0)
+    return np.column_stack([
+        rng.randint(1, 121, n_samples),      # age
+        rng.uniform(5, 80, n_samples),       # bmi
+        rng.randint(70, 201, n_samples),     # bp_systolic
+        rng.randint(40, 131, n_samples),     # bp_diastolic
+        rng.uniform(40, 400, n_samples)      # blood_sugar
+    ]).astype(np.float64)
+
+def threshold_inputs(model, features):
+    """Rows with one feature set exactly on each split threshold"""
+    estimators = getattr(model, 'estimators_', None) or [model]
+    rows = []
+
+    for estimator in estimators:
+        tree = getattr(estimator, 'tree_', None)
+        if tree is None:
+            continue
+        for node in range(tree.node_count):
+            if tree.children_left[node] == -1:
+                continue
+            row = features[len(rows) % len(features)].copy()
+            row[tree.feature[node]] = np.float32(tree.threshold[node])
+            rows.append(row)
+
+    return np.array(rows).reshape(-1, features.shape[1])
+
+def time_per_call(fn, X, repeat=200):
+    """Mean seconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat
+
+def check_parity():
+    """Compare native and sklearn outputs for the scaler and all models"""
+    failures = 0
+    raw = generate_inputs()
+
+    scaler = joblib.load(os.path.join(MODELS_PATH, 'scaler.pkl'))
+    native_scaler = compile_model(scaler)
+    features = scaler.transform(raw)
+
+    if np.array_equal(features, native_scaler.transform(raw)):
+        print("✓ scaler: identical")
+    else:
+        print("✗ scaler: outputs differ")
+        failures += 1
+
+    for condition in CONDITIONS:
+        for algo in ALGORITHMS:
+            model = joblib.load(os.path.join(MODELS_PATH, f'{condition}_{algo}.pkl'))
+            native_model = compile_model(model)
+
+            X = np.vstack([features, threshold_inputs(model, features)])
+            expected = model.predict_proba(X)
+            actual = native_model.predict_proba(X)
+
+            sklearn_time = time_per_call(model.predict_proba, X[:1])
+            native_time = time_per_call(native_model.predict_proba, X[:1])
+
+            if np.array_equal(expected, actual):
+                status = "✓"
+            else:
+                status = "✗"
+                failures += 1
+
+            print(f"{status} {condition}_{algo}: {len(X)} rows, "
+                  f"max diff={np.abs(expected - actual).max():.3g}, "
+                  f"single row {sklearn_time * 1e6:.0f}us -> {native_time * 1e6:.0f}us "
+                  f"({sklearn_time / native_time:.1f}x)")
+
+    return failures
+
+if __name__ == '__main__':
+    failures = check_parity()
+    if failures:
+        print(f"\n❌ {failures} model(s) differ from scikit-learn")
+        sys.exit(1)
+    print("\n✅ Native scoring matches scikit-learn for all models")
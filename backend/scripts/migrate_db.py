@@ -0,0 +1,98 @@
+"""
+Script to bring an existing database up to date with the models
+db.create_all() only creates missing tables; this also adds the columns
+and indexes that were added to existing tables after they were created,
+and moves predictions from per-row recommendation JSON to recommendation sets.
+Safe to run repeatedly.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect, text, or_
+from app import create_app, db
+from app.models.prediction import Prediction
+
+def add_missing_columns():
+    """Add model columns that don't exist in the database yet (as nullable columns)"""
+    inspector = inspect(db.engine)
+    added = 0
+    
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            
+            column_type = column.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+            added += 1
+            print(f"✓ Added column {table.name}.{column.name}")
+    
+    return added
+
+def compact_predictions(batch_size=1000):
+    """Replace legacy per-row recommendation and model JSON with recommendation sets and model codes"""
+    compacted = 0
+    last_id = 0
+    
+    while True:
+        predictions = Prediction.query.filter(
+            Prediction.id > last_id,
+            or_(Prediction.recommendations.isnot(None), Prediction.models_used.isnot(None))
+        ).order_by(Prediction.id).limit(batch_size).all()
+        
+        if not predictions:
+            break
+        
+        for prediction in predictions:
+            if prediction.recommendations is not None:
+                prediction.set_recommendations(prediction.get_recommendations())
+            if prediction.models_used is not None:
+                prediction.set_models_used(prediction.get_models_used())
+        
+        db.session.commit()
+        compacted += len(predictions)
+        last_id = predictions[-1].id
+        print(f"  compacted {compacted:,} predictions", end='\r')
+    
+    if compacted:
+        print()
+    return compacted
+
+def create_missing_indexes():
+    """Create model indexes that don't exist in the database yet"""
+    inspector = inspect(db.engine)
+    created = 0
+    
+    for table in db.metadata.sorted_tables:
+        existing = {index['name'] for index in inspector.get_indexes(table.name)}
+        
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing:
+                continue
+            
+            index.create(bind=db.engine)
+            created += 1
+            print(f"✓ Created index {index.name} on {table.name}")
+    
+    return created
+
+def migrate_db():
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    
+    with app.app_context():
+        # Tables are created by create_app (db.create_all)
+        added = add_missing_columns()
+        created = create_missing_indexes()
+        compacted = compact_predictions()
+        
+        print(f"\n✅ Database up to date ({added} column(s) added, {created} index(es) created, "
+              f"{compacted} prediction(s) compacted)")
+
+if __name__ == "__main__":
+    migrate_db()
@@ -0,0 +1,92 @@
+"""
+Prediction worker: drains the prediction_jobs queue filled by POST /api/predict with async
+Starts a pool of worker processes; each claims pending jobs in micro-batches and scores
+every batch with one prediction pipeline pass.
+Usage: python prediction_worker.py [--processes N] [--batch-size N] [--poll-interval SECONDS] [--once]
+"""
+import sys
+import os
+import time
+import signal
+import argparse
+import multiprocessing
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.services.prediction_queue import prediction_queue
+
+def run_worker(worker_id, batch_size, poll_interval, stop, once=False):
+    """Claim and process job batches until stopped (or, with once, until the queue is empty)"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Each process builds its own app: own database connections and loaded models
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    batch_size = batch_size or app.config['PREDICTION_WORKER_BATCH_SIZE']
+    poll_interval = poll_interval or app.config['PREDICTION_WORKER_POLL_INTERVAL']
+    job_timeout = app.config['PREDICTION_JOB_TIMEOUT']
+
+    with app.app_context():
+        while not stop.is_set():
+            jobs = prediction_queue.claim(batch_size)
+
+            if not jobs:
+                db.session.remove()
+                if once:
+                    break
+                requeued = prediction_queue.requeue_stale(job_timeout)
+                if requeued:
+                    print(f"[worker {worker_id}] Requeued {requeued} stale job(s)")
+                stop.wait(poll_interval)
+                continue
+
+            start = time.perf_counter()
+            completed = prediction_queue.process(jobs)
+            elapsed = time.perf_counter() - start
+            print(f"[worker {worker_id}] {completed}/{len(jobs)} job(s) completed in {elapsed * 1000:.0f} ms")
+
+            # Start each batch with an empty session
+            db.session.remove()
+
+def main():
+    parser = argparse.ArgumentParser(description='Process queued prediction jobs')
+    parser.add_argument('--processes', type=int, help='worker processes (default PREDICTION_WORKER_PROCESSES)')
+    parser.add_argument('--batch-size', type=int, help='jobs claimed per batch (default PREDICTION_WORKER_BATCH_SIZE)')
+    parser.add_argument('--poll-interval', type=float, help='seconds to wait when the queue is empty')
+    parser.add_argument('--once', action='store_true', help='drain the queue in this process, then exit')
+    args = parser.parse_args()
+
+    stop = multiprocessing.Event()
+
+    if args.once:
+        run_worker(0, args.batch_size, args.poll_interval, stop, once=True)
+        print("✅ Prediction queue drained")
+        return
+
+    processes = args.processes or int(os.environ.get('PREDICTION_WORKER_PROCESSES', 2))
+    workers = [
+        multiprocessing.Process(
+            target=run_worker,
+            args=(worker_id, args.batch_size, args.poll_interval, stop),
+            name=f'prediction-worker-{worker_id}'
+        )
+        for worker_id in range(processes)
+    ]
+
+    def shutdown(signum, frame):
+        print("\nStopping prediction workers...")
+        stop.set()
+
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+
+    for worker in workers:
+        worker.start()
+    print(f"✅ Started {processes} prediction worker(s)")
+
+    for worker in workers:
+        worker.join()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+Script to rebuild the user_health_summary table from existing data
+Run once after upgrading, or any time the summaries need repairing
+Usage: python rebuild_user_summaries.py [user_id ...]
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.user_health_summary import UserHealthSummary
+
+def rebuild_user_summaries(user_ids=None):
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+    
+    with app.app_context():
+        count = UserHealthSummary.rebuild(user_ids)
+        db.session.commit()
+        
+        print(f"✅ Rebuilt {count} user health summaries")
+
+if __name__ == "__main__":
+    user_ids = [int(arg) for arg in sys.argv[1:]] or None
+    rebuild_user_summaries(user_ids)
@@ -12,8 +12,15 @@ from sklearn.tree import DecisionTreeClassifier
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import StandardScaler
 import joblib
+import argparse
+import sys
 import os
 
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.native_scoring import compile_model, save_compiled
+
 # Create ml_models directory if it doesn't exist
 os.makedirs('../app/ml_models', exist_ok=True)
 
@@ -49,7 +56,17 @@ def generate_synthetic_data(n_samples=1000):
     
     return data, diabetes, heart_disease, obesity
 
-def train_models():
+def save_model(model, name, model_format):
+    """
+    Save a fitted model or scaler
+    pickle: joblib file; npy: memory-mappable array directory (app/ml_models/npy/<name>/)
+    """
+    if model_format in ('pickle', 'both'):
+        joblib.dump(model, f'../app/ml_models/{name}.pkl')
+    if model_format in ('npy', 'both'):
+        save_compiled(compile_model(model), f'../app/ml_models/npy/{name}')
+
+def train_models(model_format='pickle'):
     """Train and save all ML models"""
     print("Generating synthetic training data...")
     X, y_diabetes, y_heart, y_obesity = generate_synthetic_data(1000)
@@ -59,7 +76,7 @@ def train_models():
     X_scaled = scaler.fit_transform(X)
     
     # Save scaler
-    joblib.dump(scaler, '../app/ml_models/scaler.pkl')
+    save_model(scaler, 'scaler', model_format)
     print("✓ Saved feature scaler")
     
     # Train models for each condition
@@ -92,8 +109,7 @@ def train_models():
             test_score = model.score(X_test, y_test)
             
             # Save model
-            model_filename = f'../app/ml_models/{condition_name}_{algo_name}.pkl'
-            joblib.dump(model, model_filename)
+            save_model(model, f'{condition_name}_{algo_name}', model_format)
             
             print(f"  ✓ {algo_name.upper()}: Train={train_score:.3f}, Test={test_score:.3f}")
     
@@ -101,4 +117,10 @@ def train_models():
     print("Models saved in: ../app/ml_models/")
 
 if __name__ == '__main__':
-    train_models()
+    parser = argparse.ArgumentParser(description='Train health risk prediction models')
+    parser.add_argument(
+        '--format', choices=['pickle', 'npy', 'both'], default='pickle',
+        help='Model artifact format (npy can be memory-mapped with ML_MODEL_FORMAT=npy)'
+    )
+    args = parser.parse_args()
+    train_models(args.format)
@@ -0,0 +1,90 @@
+import os
+import sys
+import joblib
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+# Make the app package importable when pytest runs from backend/ or tests/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CONDITIONS = ['diabetes', 'heart', 'obesity']
+
+def generate_features(n_samples, seed=0):
+    """Random raw feature rows (age, bmi, bp_systolic, bp_diastolic, blood_sugar) in the validated ranges"""
+    rng = np.random.RandomState(seed)
+    return np.column_stack([
+        rng.randint(1, 121, n_samples),
+        rng.uniform(5, 80, n_samples),
+        rng.randint(70, 201, n_samples),
+        rng.randint(40, 131, n_samples),
+        rng.uniform(40, 400, n_samples)
+    ]).astype(np.float64)
+
+def make_models():
+    """Small scaler and lr/dt/rf models per condition, trained on synthetic labels"""
+    X = generate_features(400)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+
+    labels = {
+        'diabetes': (X[:, 4] > 140) | (X[:, 1] > 35),
+        'heart': (X[:, 2] > 150) | (X[:, 0] > 70),
+        'obesity': X[:, 1] > 30
+    }
+
+    models = {}
+    for condition in CONDITIONS:
+        y = labels[condition].astype(int)
+        models[f'{condition}_lr'] = LogisticRegression(random_state=42, max_iter=1000).fit(X_scaled, y)
+        models[f'{condition}_dt'] = DecisionTreeClassifier(random_state=42, max_depth=5).fit(X_scaled, y)
+        models[f'{condition}_rf'] = RandomForestClassifier(
+            random_state=42, n_estimators=10, max_depth=5
+        ).fit(X_scaled, y)
+    return scaler, models
+
+@pytest.fixture(scope='session')
+def trained_models():
+    """(scaler, {'<condition>_<algo>': model}) trained once per test session"""
+    return make_models()
+
+@pytest.fixture(scope='session')
+def models_path(tmp_path_factory, trained_models):
+    """Directory with the trained models saved the way ML_MODELS_PATH expects them"""
+    path = tmp_path_factory.mktemp('ml_models')
+    scaler, models = trained_models
+    joblib.dump(scaler, path / 'scaler.pkl')
+    for name, model in models.items():
+        joblib.dump(model, path / f'{name}.pkl')
+    return str(path)
+
+@pytest.fixture
+def app(tmp_path, models_path, monkeypatch):
+    """Testing app on its own SQLite file, scoring with the session's trained models"""
+    from app import create_app, db
+    from app.config import TestingConfig
+    from app.services.ml_service import ml_service
+
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(TestingConfig, 'ML_MODELS_PATH', models_path)
+
+    app = create_app('testing')
+    with app.app_context():
+        ml_service.load_models(force=True)
+
+    yield app
+
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header for a newly registered user"""
+    response = client.post('/api/auth/register', json={
+        'email': 'test@example.com', 'password': 'secret123', 'name': 'Test User', 'age': 45
+    })
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
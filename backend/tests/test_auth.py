@@ -0,0 +1,28 @@
+import logging
+from app.models.user import User
+from app.services.password_hasher import password_hasher
+
+CREDENTIALS = {'email': 'test@example.com', 'password': 'secret123'}
+
+def test_login_rehashes_to_new_cost(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(password_hasher, 'log_rounds', password_hasher.log_rounds + 1)
+
+    response = client.post('/api/auth/login', json=CREDENTIALS)
+
+    assert response.status_code == 200
+    assert not password_hasher.needs_rehash(User.query.filter_by(email=CREDENTIALS['email']).one().password_hash)
+
+def test_failed_rehash_is_logged_and_login_succeeds(client, auth_headers, monkeypatch, caplog):
+    def broken_set_password(self, password):
+        raise RuntimeError('hash backend unavailable')
+
+    monkeypatch.setattr(password_hasher, 'log_rounds', password_hasher.log_rounds + 1)
+    monkeypatch.setattr(User, 'set_password', broken_set_password)
+    failures = password_hasher.rehash_failures
+
+    with caplog.at_level(logging.ERROR):
+        response = client.post('/api/auth/login', json=CREDENTIALS)
+
+    assert response.status_code == 200
+    assert 'Password rehash failed' in caplog.text
+    assert password_hasher.stats()['rehash_failures'] == failures + 1
@@ -0,0 +1,90 @@
+import math
+import numpy as np
+import pytest
+from app.services.risk_scorer import risk_scorer
+from app.services.recommendation_engine import (
+    BMI_THRESHOLDS, DIABETES_THRESHOLDS, HEART_THRESHOLDS, OBESITY_THRESHOLDS, recommendation_engine
+)
+
+# Every value a scoring or recommendation rule compares against
+RISK_VALUES = sorted(set(DIABETES_THRESHOLDS + HEART_THRESHOLDS + OBESITY_THRESHOLDS + (0.0, 1.0)))
+BMI_VALUES = sorted(set(BMI_THRESHOLDS + (18.5, 25, 30)))
+
+def random_inputs(n_samples=20000):
+    """Random risks and BMIs, a fifth of them exactly on a rule threshold"""
+    rng = np.random.RandomState(0)
+
+    def column(low, high, thresholds):
+        values = rng.uniform(low, high, n_samples)
+        on_threshold = rng.rand(n_samples) < 0.2
+        values[on_threshold] = rng.choice(thresholds, on_threshold.sum())
+        return values
+
+    return (
+        column(0, 1, RISK_VALUES),
+        column(0, 1, RISK_VALUES),
+        column(0, 1, RISK_VALUES),
+        column(12, 50, BMI_VALUES)
+    )
+
+def threshold_inputs():
+    """Every combination of threshold values, plus NaN in each position"""
+    values = RISK_VALUES + [math.nan]
+    grid = np.array(np.meshgrid(values, values, values, BMI_VALUES + [math.nan])).reshape(4, -1)
+    return tuple(grid)
+
+def score_scalar(diabetes, heart, obesity, bmi):
+    scores, categories = [], []
+    for d, h, o, b in zip(diabetes.tolist(), heart.tolist(), obesity.tolist(), bmi.tolist()):
+        score = risk_scorer.calculate_overall_risk_score(d, h, o, b)
+        scores.append(score)
+        categories.append(risk_scorer.classify_risk(score))
+    return scores, categories
+
+def same_scores(expected, actual):
+    return len(expected) == len(actual) and all(
+        e == a or (math.isnan(e) and math.isnan(a)) for e, a in zip(expected, actual)
+    )
+
+@pytest.fixture(params=['random', 'thresholds'])
+def inputs(request):
+    return random_inputs() if request.param == 'random' else threshold_inputs()
+
+def test_risk_scores_match_scalar(inputs):
+    expected, _ = score_scalar(*inputs)
+
+    actual = risk_scorer.calculate_overall_risk_score_batch(*inputs)
+
+    assert same_scores(expected, actual)
+
+def test_risk_categories_match_scalar(inputs):
+    scores, expected = score_scalar(*inputs)
+
+    assert risk_scorer.classify_risk_batch(scores) == expected
+
+@pytest.mark.parametrize('score', [0.0, 29.99, 30.0, 30.01, 59.99, 60.0, 100.0, math.nan])
+def test_risk_category_boundaries(score):
+    assert risk_scorer.classify_risk_batch([score]) == [risk_scorer.classify_risk(score)]
+
+def test_recommendations_match_rules(inputs):
+    diabetes, heart, obesity, bmi = inputs
+    _, categories = score_scalar(*inputs)
+
+    actual = recommendation_engine.generate_recommendations_batch(diabetes, heart, obesity, bmi, categories)
+
+    for i, recommendations in enumerate(actual):
+        args = (diabetes[i], heart[i], obesity[i], bmi[i], categories[i])
+        assert recommendations == recommendation_engine.evaluate_rules(*args)
+        assert recommendations == recommendation_engine.generate_recommendations(*args)
+
+def test_recommendations_for_every_category_on_thresholds():
+    diabetes, heart, obesity, bmi = threshold_inputs()
+
+    for category in ('Low', 'Medium', 'High'):
+        categories = [category] * len(diabetes)
+        actual = recommendation_engine.generate_recommendations_batch(diabetes, heart, obesity, bmi, categories)
+
+        for i, recommendations in enumerate(actual):
+            assert recommendations == recommendation_engine.evaluate_rules(
+                diabetes[i], heart[i], obesity[i], bmi[i], category
+            )
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+from app.services.native_scoring import (
+    CompiledLinearModel, CompiledScaler, CompiledTreeEnsemble, compile_model, load_compiled, save_compiled
+)
+from conftest import CONDITIONS, generate_features
+
+ALGORITHMS = ['lr', 'dt', 'rf']
+
+def threshold_inputs(model, features):
+    """Rows with one feature set exactly on each split threshold"""
+    estimators = getattr(model, 'estimators_', None) or [model]
+    rows = []
+
+    for estimator in estimators:
+        tree = getattr(estimator, 'tree_', None)
+        if tree is None:
+            continue
+        for node in range(tree.node_count):
+            if tree.children_left[node] == -1:
+                continue
+            row = features[len(rows) % len(features)].copy()
+            row[tree.feature[node]] = np.float32(tree.threshold[node])
+            rows.append(row)
+
+    return np.array(rows).reshape(-1, features.shape[1])
+
+@pytest.fixture(scope='module')
+def features(trained_models):
+    scaler, _ = trained_models
+    return scaler.transform(generate_features(2000, seed=1))
+
+def model_inputs(model, features):
+    return np.vstack([features, threshold_inputs(model, features)])
+
+def test_scaler_matches_sklearn(trained_models):
+    scaler, _ = trained_models
+    raw = generate_features(2000, seed=1)
+
+    native = compile_model(scaler)
+
+    assert isinstance(native, CompiledScaler)
+    assert np.array_equal(native.transform(raw), scaler.transform(raw))
+
+@pytest.mark.parametrize('condition', CONDITIONS)
+@pytest.mark.parametrize('algo', ALGORITHMS)
+def test_predict_proba_matches_sklearn(trained_models, features, condition, algo):
+    model = trained_models[1][f'{condition}_{algo}']
+    X = model_inputs(model, features)
+
+    native = compile_model(model)
+
+    assert isinstance(native, CompiledLinearModel if algo == 'lr' else CompiledTreeEnsemble)
+    assert np.array_equal(native.predict_proba(X), model.predict_proba(X))
+
+@pytest.mark.parametrize('algo', ALGORITHMS)
+def test_single_row_matches_sklearn(trained_models, features, algo):
+    model = trained_models[1][f'diabetes_{algo}']
+    native = compile_model(model)
+
+    for row in features[:50]:
+        assert np.array_equal(native.predict_proba(row[np.newaxis]), model.predict_proba(row[np.newaxis]))
+
+@pytest.mark.parametrize('algo', ALGORITHMS)
+def test_npy_round_trip(tmp_path, trained_models, features, algo):
+    model = trained_models[1][f'heart_{algo}']
+    X = model_inputs(model, features)
+    save_compiled(compile_model(model), tmp_path / algo)
+
+    loaded = load_compiled(tmp_path / algo)
+
+    assert np.array_equal(loaded.predict_proba(X), model.predict_proba(X))
+    assert np.array_equal(loaded.classes_, model.classes_)
+
+def test_npy_round_trip_scaler(tmp_path, trained_models):
+    scaler, _ = trained_models
+    raw = generate_features(500, seed=2)
+    save_compiled(compile_model(scaler), tmp_path / 'scaler')
+
+    loaded = load_compiled(tmp_path / 'scaler')
+
+    assert np.array_equal(loaded.transform(raw), scaler.transform(raw))
+
+def test_npy_round_trip_memory_maps_arrays(tmp_path, trained_models):
+    save_compiled(compile_model(trained_models[1]['obesity_rf']), tmp_path / 'rf')
+
+    mapped = load_compiled(tmp_path / 'rf')
+    in_memory = load_compiled(tmp_path / 'rf', mmap_mode=None)
+
+    assert isinstance(mapped.threshold, np.memmap)
+    assert not mapped.threshold.flags.writeable
+    assert not isinstance(in_memory.threshold, np.memmap)
+
+def test_unsupported_model_rejected():
+    with pytest.raises(TypeError):
+        compile_model(object())
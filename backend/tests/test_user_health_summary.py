@@ -0,0 +1,118 @@
+import pytest
+from app import db
+from app.models.health_record import HealthRecord
+from app.models.user_health_summary import UserHealthSummary
+
+SUMMARY_COLUMNS = (
+    'record_count', 'bmi_sum', 'prediction_count',
+    'latest_prediction_id', 'latest_risk_score', 'previous_risk_score'
+)
+
+def health_record(i):
+    return {
+        'height': 165 + i,
+        'weight': 60 + 4 * i,
+        'blood_pressure_systolic': 115 + 5 * i,
+        'blood_pressure_diastolic': 75 + i,
+        'blood_sugar': 90 + 12 * i
+    }
+
+def create_records(client, headers, count, offset=0):
+    ids = []
+    for i in range(offset, offset + count):
+        response = client.post('/api/health/record', headers=headers, json=health_record(i))
+        assert response.status_code == 201
+        ids.append(response.get_json()['health_record']['id'])
+    return ids
+
+def predict(client, headers, health_record_id):
+    response = client.post('/api/predict', headers=headers, json={'health_record_id': health_record_id})
+    assert response.status_code == 201
+
+@pytest.fixture
+def existing_user(client, auth_headers):
+    """User with records and predictions but no summary row, as before summaries existed"""
+    ids = create_records(client, auth_headers, 4)
+    for health_record_id in ids[:3]:
+        predict(client, auth_headers, health_record_id)
+
+    user_id = db.session.get(HealthRecord, ids[0]).user_id
+    UserHealthSummary.query.filter_by(user_id=user_id).delete()
+    db.session.commit()
+    return user_id, ids
+
+def assert_summary_matches_aggregate(user_id):
+    db.session.expire_all()
+    summary = db.session.get(UserHealthSummary, user_id)
+    expected = UserHealthSummary._aggregate([user_id])[user_id]
+
+    assert summary is not None
+    for column in SUMMARY_COLUMNS:
+        assert getattr(summary, column) == pytest.approx(getattr(expected, column)), column
+
+def test_create_health_record_seeds_missing_summary(client, auth_headers, existing_user):
+    user_id, _ = existing_user
+
+    create_records(client, auth_headers, 1, offset=4)
+
+    assert_summary_matches_aggregate(user_id)
+    assert db.session.get(UserHealthSummary, user_id).record_count == 5
+
+def test_predict_seeds_missing_summary(client, auth_headers, existing_user):
+    user_id, ids = existing_user
+
+    predict(client, auth_headers, ids[3])
+
+    assert_summary_matches_aggregate(user_id)
+    assert db.session.get(UserHealthSummary, user_id).prediction_count == 4
+
+def test_predict_batch_seeds_missing_summary(client, auth_headers, existing_user):
+    user_id, ids = existing_user
+
+    response = client.post('/api/predict/batch', headers=auth_headers, json={'health_record_ids': ids})
+    assert response.status_code == 201
+
+    assert_summary_matches_aggregate(user_id)
+    assert db.session.get(UserHealthSummary, user_id).prediction_count == 7
+
+def test_bulk_import_with_scoring_seeds_missing_summary(client, auth_headers, existing_user):
+    user_id, _ = existing_user
+
+    response = client.post(
+        '/api/health/records/bulk?score=true', headers=auth_headers,
+        json=[health_record(i) for i in range(4, 10)]
+    )
+    assert response.status_code == 201
+    assert response.get_json()['predictions_created'] == 6
+
+    assert_summary_matches_aggregate(user_id)
+    summary = db.session.get(UserHealthSummary, user_id)
+    assert (summary.record_count, summary.prediction_count) == (10, 9)
+
+def test_concurrent_seed_applies_increment(client, auth_headers, existing_user, monkeypatch):
+    user_id, _ = existing_user
+    aggregate = UserHealthSummary._aggregate
+
+    def aggregate_after_concurrent_seed(user_ids=None):
+        # Another writer seeds the row, without this transaction's new record, between our
+        # lookup and our insert (SQLite allows one writer, so it goes through this connection)
+        summaries = aggregate(user_ids)
+        seeded = summaries[user_id]
+        new_record = HealthRecord.query.filter_by(user_id=user_id).order_by(HealthRecord.id.desc()).first()
+        db.session.execute(UserHealthSummary.__table__.insert(), [{
+            'user_id': user_id,
+            'record_count': seeded.record_count - 1,
+            'bmi_sum': seeded.bmi_sum - new_record.bmi,
+            'prediction_count': seeded.prediction_count,
+            'latest_prediction_id': seeded.latest_prediction_id,
+            'latest_risk_score': seeded.latest_risk_score,
+            'previous_risk_score': seeded.previous_risk_score
+        }])
+        return summaries
+
+    monkeypatch.setattr(UserHealthSummary, '_aggregate', aggregate_after_concurrent_seed)
+    create_records(client, auth_headers, 1, offset=4)
+    monkeypatch.setattr(UserHealthSummary, '_aggregate', aggregate)
+
+    assert_summary_matches_aggregate(user_id)
+    assert db.session.get(UserHealthSummary, user_id).record_count == 5